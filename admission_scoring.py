@@ -0,0 +1,187 @@
+"""내신 기반 합격 가능성 계산
+
+여러 해의 대학별(선택적으로 학과별) 입시 결과(평균 등급과 편차)를 배열로 모아 두고,
+학생 내신 하나를 모든 대학 / 학과와 한 번에(벡터 연산으로) 비교해 합격 가능성과 구분
+(안전 / 적정 / 도전)을 계산합니다.
+
+입시 결과 파일 형식 (data/grade_cutoffs.csv, 선택)::
+
+    대학명,학과명,연도,평균등급,표준편차
+    서울대학교,,2023,1.5,0.25
+    서울대학교,컴퓨터공학부,2023,1.3,0.2
+
+학과명이 비어 있으면 대학 전체 결과로 봅니다. 파일이 없거나 파일에 없는 대학은
+university_info.csv의 평균등급을 한 해치 결과로 사용합니다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from query_engine import table_version
+
+CUTOFF_FILE = 'data/grade_cutoffs.csv'
+
+DEFAULT_SPREAD = 0.3   # 편차 정보가 없을 때 쓰는 등급 편차
+MIN_SPREAD = 0.05      # 편차가 너무 작아 확률이 0/1로만 나오는 것 방지
+YEAR_DECAY = 0.7       # 한 해 전 결과의 가중치 (최근 결과일수록 중요)
+
+# 구분 기준 (z = (내신 - 평균등급) / 편차). 기본 편차에서
+# 평균 - 0.1등급 이하 = 안전 (합격 가능성 약 63% 이상), 평균 + 0.2등급 이하 = 적정,
+# 평균 + 0.3등급 이하 = 도전. 평균과 같은 내신(반반 확률)은 적정으로 봅니다.
+BANDS = [
+    (-0.1 / DEFAULT_SPREAD, '안전'),
+    (0.2 / DEFAULT_SPREAD, '적정'),
+    (0.3 / DEFAULT_SPREAD, '도전'),
+]
+BAND_LABELS = {'안전': '✅ 안전', '적정': '⚠️ 적정', '도전': '🔶 도전'}
+
+# (대학 표 버전, 파일 수정 시각) -> CutoffTable
+_TABLE_CACHE = {}
+
+
+def _normal_cdf(x):
+    """표준정규분포 누적확률 (Abramowitz-Stegun 7.1.26 근사, 오차 1.5e-7 이하)"""
+    z = np.abs(x) / np.sqrt(2)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+class CutoffTable:
+    """대학 / 학과별 입시 결과를 연도 축으로 모은 배열
+
+    - university, program: 프로그램(대학 + 학과)별 이름 배열
+    - mean, spread: 연도 가중 평균 등급과 편차 (float32)
+    """
+
+    def __init__(self, cutoffs):
+        cutoffs = cutoffs.copy()
+        cutoffs['학과명'] = cutoffs['학과명'].fillna('').astype(str).str.strip()
+        if '표준편차' not in cutoffs.columns:
+            cutoffs['표준편차'] = np.nan
+
+        keys = cutoffs['대학명'].astype(str) + '\t' + cutoffs['학과명']
+        program_codes, programs = pd.factorize(keys)
+        year_codes, years = pd.factorize(cutoffs['연도'].astype(int), sort=True)
+
+        shape = (len(programs), len(years))
+        means = np.full(shape, np.nan, dtype=np.float32)
+        spreads = np.full(shape, np.nan, dtype=np.float32)
+        means[program_codes, year_codes] = cutoffs['평균등급'].to_numpy(dtype=np.float32)
+        spreads[program_codes, year_codes] = cutoffs['표준편차'].to_numpy(dtype=np.float32)
+
+        # 최근 연도일수록 큰 가중치, 결과가 없는 해는 0
+        weights = YEAR_DECAY ** (years.max() - years.to_numpy()).astype(np.float32)
+        weights = np.where(np.isnan(means), 0.0, weights[np.newaxis, :]).astype(np.float32)
+        total = weights.sum(axis=1)
+
+        mean = np.nansum(means * weights, axis=1) / total
+        # 편차 = 해마다의 편차 + 해에 따른 평균 변동 (가중 합)
+        within = np.where(np.isnan(spreads), DEFAULT_SPREAD, spreads) ** 2
+        between = np.nan_to_num(means - mean[:, np.newaxis]) ** 2
+        spread = np.sqrt((weights * (within + between)).sum(axis=1) / total)
+
+        split = programs.str.split('\t', n=1)
+        self.university = np.array([s[0] for s in split], dtype=object)
+        self.program = np.array([s[1] for s in split], dtype=object)
+        self.mean = mean.astype(np.float32)
+        self.spread = np.maximum(spread, MIN_SPREAD).astype(np.float32)
+        self.years = years.to_numpy()
+
+    def __len__(self):
+        return len(self.mean)
+
+    def score(self, grade):
+        """내신 등급 하나를 모든 프로그램과 비교 -> (합격 확률 배열, z 배열)"""
+        z = (np.float32(grade) - self.mean) / self.spread
+        return 1.0 - _normal_cdf(z), z
+
+
+def _cutoffs_from_universities(university_df, year=0):
+    """입시 결과가 없는 대학: 대학 정보의 평균등급을 한 해치 결과로 사용"""
+    return pd.DataFrame({
+        '대학명': university_df['대학명'],
+        '학과명': '',
+        '연도': year,
+        '평균등급': university_df['평균등급'],
+    })
+
+
+def _load_cutoffs(university_df, path):
+    """입시 결과 파일 + 파일에 없는 대학은 대학 정보의 평균등급으로 채운 표"""
+    if not os.path.exists(path):
+        return _cutoffs_from_universities(university_df)
+    cutoffs = pd.read_csv(path)
+    missing = university_df[~university_df['대학명'].isin(cutoffs['대학명'])]
+    if missing.empty:
+        return cutoffs
+    # 가장 최근 연도의 결과로 넣어야 연도 가중치가 0이 되지 않음
+    latest = int(cutoffs['연도'].max()) if len(cutoffs) else 0
+    return pd.concat([cutoffs, _cutoffs_from_universities(missing, latest)], ignore_index=True)
+
+
+def get_cutoff_table(university_df, path=CUTOFF_FILE):
+    """입시 결과 배열 조회 (데이터가 바뀐 경우에만 다시 생성)"""
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    key = (table_version(university_df), path, mtime)
+    table = _TABLE_CACHE.get(key)
+    if table is None:
+        # 다른 스레드가 동시에 캐시를 비울 수 있으므로 만든 표를 그대로 반환
+        table = CutoffTable(_load_cutoffs(university_df, path))
+        _TABLE_CACHE.clear()
+        _TABLE_CACHE[key] = table
+    return table
+
+
+def _bands(z):
+    """z 배열 -> 구분 배열 (도전 기준을 넘으면 빈 문자열)"""
+    # 소수 오차로 경계값(예: 정확히 평균 + 0.3등급)이 밀려나지 않도록 약간의 여유
+    conditions = [z <= limit + 1e-4 for limit, _ in BANDS]
+    return np.select(conditions, [label for _, label in BANDS], default='')
+
+
+def score_admission(grade, university_df, by_program=False, include_all=False):
+    """내신으로 합격 가능성 계산
+
+    반환 열: 대학명, (학과명), 평균등급, 편차, 합격확률, 구분
+    by_program=False면 대학마다 한 행이며, 학과별 결과만 있는 대학은 합격 가능성이
+    가장 높은 학과를 학과명과 함께 돌려줍니다.
+    합격확률이 낮은(도전) 곳부터 높은(안전) 곳 순서로 정렬하며,
+    include_all=False면 도전 기준 밖의 대학은 제외합니다.
+    """
+    table = get_cutoff_table(university_df)
+    probability, z = table.score(grade)
+    bands = _bands(z)
+
+    if by_program:
+        mask = np.ones(len(table), dtype=bool)
+    else:
+        # 대학 전체 결과가 있으면 그것만, 학과별 결과만 있는 대학은
+        # 합격 가능성이 가장 높은 학과 하나로 대표 (대학마다 한 행)
+        overall = table.program == ''
+        has_overall = pd.Series(overall).groupby(table.university).transform('any').to_numpy()
+        candidates = np.flatnonzero(~has_overall)
+        best = (
+            pd.Series(probability[candidates], index=candidates)
+            .groupby(table.university[candidates]).idxmax().to_numpy()
+        )
+        mask = overall.copy()
+        mask[best.astype(int)] = True
+    if not include_all:
+        mask &= bands != ''
+
+    result = pd.DataFrame({
+        '대학명': table.university[mask],
+        '학과명': table.program[mask],
+        '평균등급': np.round(table.mean[mask].astype(float), 2),
+        '편차': np.round(table.spread[mask].astype(float), 2),
+        '합격확률': probability[mask],
+        '구분': bands[mask],
+    })
+    order = np.lexsort((result['평균등급'].to_numpy(), result['합격확률'].to_numpy()))
+    result = result.iloc[order].reset_index(drop=True)
+    if not by_program and (result['학과명'] == '').all():
+        result = result.drop(columns='학과명')
+    return result
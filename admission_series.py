@@ -0,0 +1,161 @@
+"""진학률 시계열 저장소
+
+연도별 전국 통계(admission_rate.csv)뿐 아니라 월별 / 지역별 / 학교유형별로 잘게 나뉜
+진학률 데이터(admission_monthly.csv)를 한 곳에 모아 두고,
+
+- 연도 / 지역 / 학교유형 단위로 미리 집계한 롤업
+- 그래프 폭(픽셀 수)에 맞춘 모양 보존 다운샘플링 (LTTB)
+
+을 제공합니다. 데이터가 수십 년치로 늘어나도 그래프에 넘기는 점 개수는 일정합니다.
+
+월별 파일 형식::
+
+    날짜,지역,학교유형,대학진학률,4년제진학률,전문대진학률,재수생비율
+    1995-01,서울,일반고,61.2,44.0,17.2,20.1
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from query_engine import table_version
+
+FINE_DATA_FILE = 'data/admission_monthly.csv'
+METRICS = ['대학진학률', '4년제진학률', '전문대진학률', '재수생비율']
+ALL_REGIONS = '전국'
+ALL_SCHOOL_TYPES = '전체'
+
+# 그래프 한 줄에 그릴 최대 점 개수 (대략 그래프 가로 픽셀 수)
+DEFAULT_POINT_BUDGET = 600
+
+# (연도별 데이터 버전, 월별 파일 수정 시각) -> AdmissionSeries
+_STORE_CACHE = {}
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets 다운샘플링
+
+    첫 점과 마지막 점은 그대로 두고, 나머지 구간을 threshold - 2개 버킷으로 나눠
+    버킷마다 이웃 점들과 만드는 삼각형 넓이가 가장 큰 점 하나를 고릅니다.
+    선택된 점들의 위치(index) 배열을 반환합니다.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 버킷의 평균점 (마지막 버킷이면 마지막 점)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        area = np.abs(
+            (x[prev] - avg_x) * (bucket_y - y[prev])
+            - (x[prev] - bucket_x) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return selected
+
+
+def _from_yearly(admission_df):
+    """연도별 전국 통계를 시계열 형식으로 변환"""
+    df = admission_df.copy()
+    df['날짜'] = pd.to_datetime(df['연도'].astype(str), format='%Y')
+    df['지역'] = ALL_REGIONS
+    df['학교유형'] = ALL_SCHOOL_TYPES
+    return df[['날짜', '지역', '학교유형'] + [m for m in METRICS if m in df.columns]]
+
+
+def _from_fine(path):
+    """월별 / 지역별 / 학교유형별 파일 로드"""
+    df = pd.read_csv(path)
+    df['날짜'] = pd.to_datetime(df['날짜'])
+    df['지역'] = df.get('지역', ALL_REGIONS)
+    df['학교유형'] = df.get('학교유형', ALL_SCHOOL_TYPES)
+    for col in ['지역', '학교유형']:
+        df[col] = df[col].astype('category')
+    return df
+
+
+class AdmissionSeries:
+    """진학률 시계열과 미리 계산한 롤업"""
+
+    def __init__(self, data):
+        self.data = data.sort_values('날짜').reset_index(drop=True)
+        self.metrics = [m for m in METRICS if m in self.data.columns]
+        year = self.data['날짜'].dt.year.rename('연도')
+
+        # 롤업: (기준 열) -> 연도별 평균 표
+        self.rollups = {
+            None: self.data.groupby(year)[self.metrics].mean(),
+        }
+        for key in ['지역', '학교유형']:
+            if self.data[key].nunique() > 1:
+                self.rollups[key] = (
+                    self.data.groupby([year, self.data[key]], observed=True)[self.metrics]
+                    .mean()
+                )
+
+        # 가장 잘게 나뉜 전국 시계열 (날짜별 평균)
+        self._national = self.data.groupby('날짜')[self.metrics].mean()
+
+    @property
+    def is_fine(self):
+        """연도보다 잘게 나뉜 데이터가 있는지"""
+        return len(self._national) > len(self.rollups[None])
+
+    def yearly(self, by=None):
+        """연도별 롤업 (by: None / '지역' / '학교유형')"""
+        return self.rollups.get(by, self.rollups[None])
+
+    def series(self, metric, region=None, school_type=None):
+        """조건에 맞는 원본 해상도 시계열 (날짜 인덱스)"""
+        if region is None and school_type is None:
+            return self._national[metric]
+        mask = np.ones(len(self.data), dtype=bool)
+        if region is not None:
+            mask &= (self.data['지역'] == region).to_numpy()
+        if school_type is not None:
+            mask &= (self.data['학교유형'] == school_type).to_numpy()
+        return self.data[mask].groupby('날짜')[metric].mean()
+
+    def downsampled(self, metric, budget=DEFAULT_POINT_BUDGET, **filters):
+        """그래프용으로 점 개수를 budget 이하로 줄인 시계열"""
+        values = self.series(metric, **filters).dropna()
+        if len(values) <= budget:
+            return values
+        x = values.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        return values.iloc[lttb(x, values.to_numpy(), budget)]
+
+
+def get_admission_store(admission_df, fine_path=FINE_DATA_FILE):
+    """진학률 시계열 저장소 조회 (데이터가 바뀐 경우에만 다시 생성)"""
+    fine_mtime = os.path.getmtime(fine_path) if os.path.exists(fine_path) else None
+    key = (table_version(admission_df), fine_path, fine_mtime)
+    store = _STORE_CACHE.get(key)
+    if store is not None:
+        return store
+
+    if fine_mtime is not None:
+        data = _from_fine(fine_path)
+    else:
+        data = _from_yearly(admission_df)
+
+    store = AdmissionSeries(data)
+    _STORE_CACHE.clear()
+    _STORE_CACHE[key] = store
+    return store
@@ -0,0 +1,97 @@
+"""집계 뷰 (홈 화면 통계 / 그룹별 통계)
+
+평균, 개수, 백분위 같은 통계를 데이터 버전마다 한 번만 계산해 두고,
+테이블이 바뀌면(새 데이터프레임을 불러오면) 바뀐 테이블의 뷰만 다시 계산합니다.
+"""
+import pandas as pd
+
+from query_engine import table_version
+
+PERCENTILES = [0.25, 0.5, 0.75]
+
+# 테이블 이름 -> (데이터 버전, 뷰)
+_VIEW_CACHE = {}
+
+
+def _group_summary(df, key, columns):
+    """그룹별 개수 / 평균 / 최소 / 최대 / 백분위 표"""
+    grouped = df.groupby(key)[columns]
+    summary = grouped.agg(['count', 'mean', 'min', 'max'])
+
+    quantiles = grouped.quantile(PERCENTILES).unstack()
+    quantiles.columns = pd.MultiIndex.from_tuples(
+        [(col, f"p{int(q * 100)}") for col, q in quantiles.columns]
+    )
+    return pd.concat([summary, quantiles], axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+
+def _overall_summary(df, columns):
+    """전체 개수 / 평균 / 백분위"""
+    values = df[columns]
+    return {
+        'count': len(df),
+        'mean': values.mean().to_dict(),
+        'percentiles': {
+            f"p{int(q * 100)}": row.to_dict()
+            for q, row in values.quantile(PERCENTILES).iterrows()
+        },
+    }
+
+
+def _university_views(university_df):
+    columns = ['평균등급', '취업률', '학생수']
+    views = _overall_summary(university_df, columns)
+    views['by_location'] = _group_summary(university_df, '위치', columns)
+    return views
+
+
+def _major_views(major_df):
+    columns = ['평균연봉', '취업률']
+    views = _overall_summary(major_df, columns)
+    views['by_field'] = _group_summary(major_df, '분야', columns)
+    return views
+
+
+def _admission_views(admission_df):
+    by_year = admission_df.sort_values('연도').set_index('연도')
+    return {
+        'count': len(by_year),
+        'by_year': by_year,
+        'latest_year': int(by_year.index[-1]),
+        'latest': by_year.iloc[-1].to_dict(),
+        'mean': by_year.mean().to_dict(),
+    }
+
+
+_BUILDERS = {
+    'university': _university_views,
+    'major': _major_views,
+    'admission': _admission_views,
+}
+
+
+def get_table_views(name, df):
+    """테이블 하나의 뷰 조회 (데이터가 바뀐 경우에만 다시 계산)
+
+    name: 'university' / 'major' / 'admission'
+    """
+    version = table_version(df)
+    cached = _VIEW_CACHE.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    views = _BUILDERS[name](df)
+    _VIEW_CACHE[name] = (version, views)
+    return views
+
+
+def get_aggregate_views(university_df, major_df, admission_df):
+    """전체 집계 뷰 반환
+
+    반환값: {'university': {...}, 'major': {...}, 'admission': {...}}
+    """
+    return {
+        'university': get_table_views('university', university_df),
+        'major': get_table_views('major', major_df),
+        'admission': get_table_views('admission', admission_df),
+    }
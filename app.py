@@ -1,13 +1,22 @@
 """
 대학 정보 및 적성검사 시스템
 """
+from datetime import datetime
+import hmac
+import os
+import uuid
 import streamlit as st
 import pandas as pd
 from utils import (
-    load_data, get_response, create_visualization,
+    load_data, get_response,
     save_chat_history, load_chat_history, get_popular_topics,
-    summarize_chat, APTITUDE_QUESTIONS, analyze_aptitude
+    summarize_chat, is_unknown_response, APTITUDE_QUESTIONS, analyze_aptitude,
+    next_aptitude_question
 )
+from aggregates import get_aggregate_views
+from unanswered_tracker import get_unanswered_tracker
+from field_index import recommend_universities
+from vis_prefetch import prefetch_visualization, take_visualization, cancel_visualization
 
 # 페이지 설정
 st.set_page_config(
@@ -17,7 +26,20 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def is_admin():
+    """관리자 여부 (환경 변수 ADMIN_TOKEN과 주소의 ?admin= 값이 같을 때만)
+
+    ADMIN_TOKEN이 설정되지 않았으면 관리자 화면은 항상 숨겨집니다.
+    """
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        return False
+    given = st.experimental_get_query_params().get('admin', [''])[0]
+    return hmac.compare_digest(given.encode('utf-8'), token.encode('utf-8'))
+
 # 세션 상태 초기화
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 if 'mode' not in st.session_state:
     st.session_state.mode = None
 if 'chat_messages' not in st.session_state:
@@ -26,6 +48,8 @@ if 'aptitude_answers' not in st.session_state:
     st.session_state.aptitude_answers = []
 if 'aptitude_current_q' not in st.session_state:
     st.session_state.aptitude_current_q = 0
+if 'aptitude_adaptive' not in st.session_state:
+    st.session_state.aptitude_adaptive = False
 if 'show_visualization' not in st.session_state:
     st.session_state.show_visualization = False
 if 'last_vis_type' not in st.session_state:
@@ -33,8 +57,9 @@ if 'last_vis_type' not in st.session_state:
 if 'last_unknown_response' not in st.session_state:
     st.session_state.last_unknown_response = None
 
-# 데이터 로드
-@st.cache_data
+# 데이터 로드 (세션 사이에 같은 데이터프레임 객체를 공유해야 버전 토큰과
+# 인덱스 / 집계 캐시가 다시 계산되지 않으므로 cache_resource 사용, 읽기 전용으로만 사용)
+@st.cache_resource
 def get_data():
     return load_data()
 
@@ -52,6 +77,7 @@ with st.sidebar:
         st.session_state.chat_messages = []
         st.session_state.last_vis_type = None
         st.session_state.last_unknown_response = None
+        cancel_visualization(st.session_state.session_id)
         st.rerun()
     
     st.markdown("---")
@@ -83,11 +109,33 @@ with st.sidebar:
     
     if chat_history:
         # 최근 5개만 표시
-        for item in reversed(chat_history[-5:]):
+        answered = [item for item in chat_history if not item.get('unanswered')]
+        for item in reversed(answered[-5:]):
             if 'summary' in item:
                 st.markdown(f"- {item['summary']}")
     else:
         st.info("아직 대화 기록이 없습니다.")
+    
+    # 답하지 못한 질문 (관리자만)
+    if is_admin():
+        st.markdown("---")
+        with st.expander("❓ 답하지 못한 질문"):
+            tracker = get_unanswered_tracker()
+            top_unanswered = tracker.top(10)
+            
+            if top_unanswered:
+                st.caption(f"누적 {tracker.total}회")
+                for example, _, count in top_unanswered:
+                    st.markdown(f"- {example} (약 {count}회)")
+                st.download_button(
+                    "📥 CSV로 내보내기",
+                    tracker.to_csv().encode('utf-8-sig'),
+                    file_name="unanswered_questions.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+            else:
+                st.info("아직 답하지 못한 질문이 없습니다.")
 
 # 메인 화면
 if st.session_state.mode is None:
@@ -127,17 +175,18 @@ if st.session_state.mode is None:
     st.markdown("---")
     st.markdown("### 📈 최신 통계")
     
+    views = get_aggregate_views(university_df, major_df, admission_df)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("전체 대학 수", f"{len(university_df)}개")
+        st.metric("전체 대학 수", f"{views['university']['count']}개")
     with col2:
-        st.metric("등록 학과 수", f"{len(major_df)}개")
+        st.metric("등록 학과 수", f"{views['major']['count']}개")
     with col3:
-        latest_rate = admission_df.iloc[-1]['대학진학률']
-        st.metric("2023년 진학률", f"{latest_rate}%")
+        latest_rate = views['admission']['latest']['대학진학률']
+        st.metric(f"{views['admission']['latest_year']}년 진학률", f"{latest_rate}%")
     with col4:
-        avg_employment = major_df['취업률'].mean()
+        avg_employment = views['major']['mean']['취업률']
         st.metric("평균 취업률", f"{avg_employment:.1f}%")
 
 elif st.session_state.mode == "university":
@@ -183,7 +232,9 @@ elif st.session_state.mode == "university":
             
             # 긍정 응답 처리
             if any(word in vis_response_lower for word in ['네', '예', 'yes', '보여', '보여주', '좋아', 'ok', 'okay', '좋아요', '보고싶', '보고싶어', '보고 싶']):
-                vis = create_visualization(
+                # 제안할 때 미리 만들기 시작한 결과를 가져옴
+                vis = take_visualization(
+                    st.session_state.session_id,
                     st.session_state.last_vis_type,
                     university_df, major_df, admission_df
                 )
@@ -212,6 +263,7 @@ elif st.session_state.mode == "university":
                     "role": "assistant",
                     "content": "알겠습니다"
                 })
+                cancel_visualization(st.session_state.session_id)
                 st.session_state.last_vis_type = None
                 st.rerun()
             
@@ -248,11 +300,12 @@ elif st.session_state.mode == "university":
             )
             
             # 모르는 질문인지 확인
-            is_unknown = "죄송합니다" in response and "찾지 못하겠습니다" in response
+            is_unknown = is_unknown_response(response)
             
             # 모르는 질문이면 기록해두고, 다음에 같은 질문이 오면 무시
             if is_unknown:
                 st.session_state.last_unknown_response = user_input
+                get_unanswered_tracker().add(user_input)
             else:
                 st.session_state.last_unknown_response = None
             
@@ -269,15 +322,20 @@ elif st.session_state.mode == "university":
                     "content": "표나 그래프를 보여줄까요?"
                 })
                 st.session_state.last_vis_type = vis_type
+                prefetch_visualization(st.session_state.session_id, vis_type,
+                                       university_df, major_df, admission_df)
             
-            # 대화 기록 저장 (모르는 질문이 아닌 경우만)
-            if not is_unknown:
-                summary = summarize_chat(user_input, response)
-                save_chat_history({
-                    "question": user_input,
-                    "response": response,
-                    "summary": summary
-                })
+            # 대화 기록 저장 (모르는 질문은 요약 없이 표시만 해서 저장 -> 분석에서 비율 계산)
+            chat_item = {
+                "question": user_input,
+                "response": response,
+                "timestamp": datetime.now().isoformat(timespec='seconds')
+            }
+            if is_unknown:
+                chat_item["unanswered"] = True
+            else:
+                chat_item["summary"] = summarize_chat(user_input, response)
+            save_chat_history(chat_item)
             
             st.rerun()
     
@@ -292,10 +350,15 @@ elif st.session_state.mode == "university":
         - 컴퓨터공학과 취업률은 어떻게 되나요?
         - 의예과 정보를 알려주세요
         - 공학 계열 학과를 추천해주세요
+        - 공학이 강한 대학 알려줘
         
         **진학률 정보**
         - 최근 대학 진학률은 어떤가요?
         
+        **그룹별 통계**
+        - 분야별 평균 취업률 알려줘
+        - 지역별 대학 통계 보여줘
+        
         **내신 기반 대학 추천** ⭐
         - 내신 2.5등급으로 갈 수 있는 대학 알려줘
         - 내신 3.0등급으로 성균관대학교 들어갈 수 있나요?
@@ -307,11 +370,24 @@ elif st.session_state.mode == "aptitude":
     # 적성검사 모드
     st.title("✨ 적성검사")
     
-    if st.session_state.aptitude_current_q < len(APTITUDE_QUESTIONS):
+    # 빠른 검사: 성향이 확정되면 남은 질문 없이 바로 결과 표시
+    st.checkbox("⚡ 빠른 검사 (결과가 정해지면 바로 종료)", key="aptitude_adaptive",
+                disabled=len(st.session_state.aptitude_answers) > 0)
+    
+    current_q = next_aptitude_question(st.session_state.aptitude_answers,
+                                       adaptive=st.session_state.aptitude_adaptive)
+    
+    def save_aptitude_answer(question_id, choice):
+        # 버튼 콜백에서 답변을 저장하면 클릭 한 번에 화면이 한 번만 갱신됨
+        st.session_state.aptitude_answers.append({
+            "question_id": question_id,
+            "choice": choice
+        })
+        st.session_state.aptitude_current_q += 1
+    
+    if current_q is not None:
         # 질문 표시
-        current_q = APTITUDE_QUESTIONS[st.session_state.aptitude_current_q]
-        
-        st.markdown(f"### 질문 {current_q['id']}/{len(APTITUDE_QUESTIONS)}")
+        st.markdown(f"### 질문 {st.session_state.aptitude_current_q + 1}/{len(APTITUDE_QUESTIONS)}")
         st.markdown(f"## {current_q['question']}")
         
         # 진행 바
@@ -322,19 +398,17 @@ elif st.session_state.mode == "aptitude":
         
         # 선택지
         for key, option in current_q['options'].items():
-            if st.button(f"{key}. {option}", use_container_width=True, key=f"option_{key}"):
-                # 답변 저장
-                st.session_state.aptitude_answers.append({
-                    "question_id": current_q['id'],
-                    "choice": key
-                })
-                st.session_state.aptitude_current_q += 1
-                st.rerun()
+            st.button(f"{key}. {option}", use_container_width=True, key=f"option_{key}",
+                      on_click=save_aptitude_answer, args=(current_q['id'], key))
     
     else:
         # 결과 표시
         st.markdown("## 🎉 적성검사 완료!")
         
+        answered = len(st.session_state.aptitude_answers)
+        if answered < len(APTITUDE_QUESTIONS):
+            st.caption(f"⚡ 성향이 확정되어 {answered}개 질문만으로 검사를 마쳤습니다.")
+        
         result = analyze_aptitude(st.session_state.aptitude_answers)
         
         st.success(f"당신의 성향은 **{result['primary_type']}** 입니다!")
@@ -347,6 +421,9 @@ elif st.session_state.mode == "aptitude":
             st.info(result['description'])
             
             st.markdown("### 🎓 추천 학과")
+            recommended_universities = recommend_universities(
+                result['recommended_majors'], major_df, university_df
+            )
             for major_name in result['recommended_majors']:
                 major_info = major_df[major_df['학과명'] == major_name]
                 if not major_info.empty:
@@ -356,6 +433,11 @@ elif st.session_state.mode == "aptitude":
                         st.markdown(f"- **평균연봉**: {major_row['평균연봉']:,}만원")
                         st.markdown(f"- **취업률**: {major_row['취업률']}%")
                         st.markdown(f"- **필요역량**: {major_row['필요역량']}")
+                        universities = recommended_universities[
+                            recommended_universities['학과명'] == major_name
+                        ]['대학명']
+                        if not universities.empty:
+                            st.markdown(f"- **추천 대학**: {', '.join(universities)}")
             
             st.markdown("### 💼 추천 직업")
             careers_text = ", ".join(result['recommended_careers'][:10])
@@ -0,0 +1,248 @@
+"""적성검사 결과 일괄 리포트 생성
+
+반 / 학교 단위로 적성검사를 본 뒤 학생별 HTML 리포트를 한꺼번에 만듭니다.
+
+입력 CSV 형식 (열 이름은 질문 번호, 값은 A~D 선택지)::
+
+    이름,1,2,3,4,5,6,7,8,9,10
+    김철수,A,A,C,A,B,A,A,D,A,A
+
+실행 예시::
+
+    python batch_report.py answers.csv --output reports --workers 4
+
+스타일시트와 plotly.js 같은 공통 자원은 출력 폴더의 assets/ 에 한 번만 저장하고,
+각 리포트는 이를 참조만 합니다. 템플릿도 한 번만 읽어 워커에 넘깁니다.
+"""
+import argparse
+import html
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from string import Template
+
+import pandas as pd
+
+from utils import APTITUDE_QUESTIONS, PLOTLY_AVAILABLE, analyze_aptitude, go
+
+ASSET_DIR = 'assets'
+CSS_FILE = 'report.css'
+PLOTLY_JS_FILE = 'plotly.min.js'
+CHUNK_SIZE = 50
+
+REPORT_CSS = """
+body { font-family: 'Malgun Gothic', sans-serif; max-width: 860px; margin: 2rem auto; color: #222; }
+h1 { border-bottom: 3px solid #4a6cf7; padding-bottom: .5rem; }
+.type { font-size: 1.4rem; color: #4a6cf7; font-weight: bold; }
+table { border-collapse: collapse; width: 100%; margin: 1rem 0; }
+th, td { border: 1px solid #ddd; padding: .4rem .6rem; text-align: left; }
+th { background: #f3f5ff; }
+.bar { background: #4a6cf7; height: 1rem; display: inline-block; }
+.muted { color: gray; font-size: .9rem; }
+"""
+
+REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>$name 적성검사 결과</title>
+<link rel="stylesheet" href="$asset_dir/$css_file">
+$chart_head
+</head>
+<body>
+<h1>🎓 $name 적성검사 결과</h1>
+<p>당신의 성향은 <span class="type">$primary_type</span> 입니다.</p>
+<p>$description</p>
+
+<h2>📊 성향 분포</h2>
+$chart
+
+<h2>🎓 추천 학과</h2>
+$majors
+
+<h2>💼 추천 직업</h2>
+<p>$careers</p>
+
+<p class="muted">대학 진로 상담 시스템 | 적성검사 리포트</p>
+</body>
+</html>
+""")
+
+# 워커 프로세스에서 사용하는 공유 데이터 (initializer에서 설정)
+_worker_state = {}
+
+
+def load_answers(path):
+    """CSV에서 학생별 답변 목록 로드"""
+    df = pd.read_csv(path, dtype=str)
+    # 빈 이름은 NaN으로 읽히므로 빈 문자열로 (파일명은 student, 제목은 이름 없이)
+    names = df['이름'].fillna('').str.strip() if '이름' in df.columns else pd.Series('', index=df.index)
+    question_ids = [str(q['id']) for q in APTITUDE_QUESTIONS]
+
+    students = []
+    for (_, row), name in zip(df.iterrows(), names):
+        answers = [
+            {"question_id": int(q_id), "choice": row[q_id].strip().upper()}
+            for q_id in question_ids
+            if q_id in row and isinstance(row[q_id], str) and row[q_id].strip()
+        ]
+        students.append({"name": name, "answers": answers})
+    return students
+
+
+def write_shared_assets(output_dir):
+    """공통 자원(스타일시트, plotly.js)을 한 번만 저장"""
+    asset_path = os.path.join(output_dir, ASSET_DIR)
+    os.makedirs(asset_path, exist_ok=True)
+
+    with open(os.path.join(asset_path, CSS_FILE), 'w', encoding='utf-8') as f:
+        f.write(REPORT_CSS)
+
+    if PLOTLY_AVAILABLE:
+        from plotly.offline import get_plotlyjs
+        js_path = os.path.join(asset_path, PLOTLY_JS_FILE)
+        if not os.path.exists(js_path):
+            with open(js_path, 'w', encoding='utf-8') as f:
+                f.write(get_plotlyjs())
+
+
+@lru_cache(maxsize=512)
+def _render_chart(counts):
+    """성향 분포 차트 HTML 조각 (같은 분포는 한 번만 생성)"""
+    types = list(APTITUDE_QUESTIONS[0]['type'].values())
+    scores = dict(counts)
+    values = [scores.get(t, 0) for t in types]
+
+    if not PLOTLY_AVAILABLE:
+        total = max(sum(values), 1)
+        rows = "".join(
+            f"<tr><td>{t}</td><td><span class=\"bar\" style=\"width:{v / total * 300:.0f}px\"></span> {v}</td></tr>"
+            for t, v in zip(types, values)
+        )
+        return f"<table>{rows}</table>"
+
+    fig = go.Figure(go.Bar(x=types, y=values, marker_color='#4a6cf7'))
+    # 기본 테마(plotly 템플릿)는 리포트마다 수 KB씩 들어가므로 빼고 필요한 스타일만 지정
+    fig.update_layout(template='none', height=320, margin=dict(l=40, r=20, t=20, b=30),
+                      yaxis=dict(title='점수', gridcolor='#eeeeee'))
+    return fig.to_html(include_plotlyjs=False, full_html=False,
+                       config={'displayModeBar': False})
+
+
+def _render_majors(major_names):
+    """추천 학과 표 HTML"""
+    major_df = _worker_state['major_df']
+    rows = major_df[major_df['학과명'].isin(major_names)]
+    if rows.empty:
+        return "<p>추천 학과 정보가 없습니다.</p>"
+
+    body = "".join(
+        f"<tr><td>{html.escape(r['학과명'])}</td><td>{html.escape(r['분야'])}</td>"
+        f"<td>{r['평균연봉']:,}만원</td><td>{r['취업률']}%</td><td>{html.escape(r['필요역량'])}</td></tr>"
+        for _, r in rows.iterrows()
+    )
+    return ("<table><tr><th>학과명</th><th>분야</th><th>평균연봉</th><th>취업률</th><th>필요역량</th></tr>"
+            f"{body}</table>")
+
+
+def _report_filename(index, name):
+    """리포트 파일명 (이름에 쓸 수 없는 문자는 제거)"""
+    safe_name = re.sub(r'[\\/:*?"<>|\s]+', '_', str(name)).strip('_')
+    return f"{index:05d}_{safe_name or 'student'}.html"
+
+
+def _init_worker(major_records, output_dir, template):
+    """워커 초기화: 학과 데이터와 템플릿을 프로세스당 한 번만 받음"""
+    _worker_state['major_df'] = pd.DataFrame.from_records(major_records)
+    _worker_state['output_dir'] = output_dir
+    _worker_state['template'] = template
+
+
+def _render_chunk(chunk):
+    """학생 묶음 하나의 리포트를 생성하고, (성공 수, 실패 목록) 반환"""
+    template = _worker_state['template']
+    output_dir = _worker_state['output_dir']
+    chart_head = f'<script src="{ASSET_DIR}/{PLOTLY_JS_FILE}"></script>' if PLOTLY_AVAILABLE else ''
+
+    written = 0
+    failed = []
+    for index, student in chunk:
+        if not student['answers']:
+            failed.append((index, student['name'], '답변 없음'))
+            continue
+        try:
+            result = analyze_aptitude(student['answers'])
+        except (KeyError, StopIteration) as e:
+            failed.append((index, student['name'], f'잘못된 답변: {e}'))
+            continue
+
+        page = template.substitute(
+            name=html.escape(str(student['name'])),
+            asset_dir=ASSET_DIR,
+            css_file=CSS_FILE,
+            chart_head=chart_head,
+            primary_type=result['primary_type'],
+            description=html.escape(result['description']),
+            chart=_render_chart(tuple(sorted(result['counts'].items()))),
+            majors=_render_majors(result['recommended_majors']),
+            careers=html.escape(", ".join(result['recommended_careers'][:10])),
+        )
+        path = os.path.join(output_dir, _report_filename(index, student['name']))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(page)
+        written += 1
+    return written, failed
+
+
+def generate_reports(students, major_df, output_dir, workers=None, chunk_size=CHUNK_SIZE):
+    """학생별 리포트를 프로세스 풀로 생성
+
+    진행 상황을 (처리한 학생 수, 전체 학생 수, 실패 목록) 형태로 계속 내보내는 제너레이터입니다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    write_shared_assets(output_dir)
+
+    indexed = list(enumerate(students, 1))
+    chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+    total = len(indexed)
+    done = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(major_df.to_dict('records'), output_dir, REPORT_TEMPLATE),
+    ) as executor:
+        futures = {executor.submit(_render_chunk, chunk): len(chunk) for chunk in chunks}
+        for future in as_completed(futures):
+            _, failed = future.result()
+            done += futures[future]
+            yield done, total, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='적성검사 결과 일괄 리포트 생성')
+    parser.add_argument('answers', help='학생별 답변 CSV 파일')
+    parser.add_argument('--output', default='reports', help='리포트 저장 폴더 (기본: reports)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='워커에 한 번에 넘길 학생 수')
+    args = parser.parse_args(argv)
+
+    students = load_answers(args.answers)
+    major_df = pd.read_csv('data/major_info.csv')
+
+    all_failed = []
+    for done, total, failed in generate_reports(students, major_df, args.output,
+                                                args.workers, args.chunk_size):
+        all_failed.extend(failed)
+        print(f"\r리포트 생성 중... {done}/{total}", end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    for index, name, reason in all_failed:
+        print(f"⚠️ {index}번 {name}: {reason}", file=sys.stderr)
+    print(f"완료: {len(students) - len(all_failed)}개 리포트 -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
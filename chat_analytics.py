@@ -0,0 +1,285 @@
+"""대화 기록 오프라인 분석
+
+몇 달치 대화 기록 보관 파일을 메모리에 한꺼번에 올리지 않고 한 줄(한 기록)씩 흘려보내며
+주제별 추이, 답하지 못한 질문 비율, 많이 물어본 대학 / 학과, 내신 등급 분포를 집계합니다.
+
+지원 형식:
+
+- JSON Lines (.jsonl): 한 줄에 기록 하나. 파일을 바이트 구간으로 나눠 여러 프로세스가 나눠 처리
+- JSON 배열 (.json, chat_history.json 형식): 앞에서부터 조금씩 읽어 기록 묶음을 프로세스에 전달
+
+실행 예시::
+
+    python chat_analytics.py logs/2025-*.jsonl --workers 4
+    python chat_analytics.py data/chat_history.json --json
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from utils import (
+    question_topics, summarize_chat, extract_grade, is_unknown_response,
+    SUMMARY_UNIVERSITIES, SUMMARY_MAJORS
+)
+
+SHARD_SIZE = 64 * 1024 * 1024   # JSON Lines 파일을 나누는 단위 (바이트)
+BATCH_SIZE = 5000               # JSON 배열 파일에서 한 번에 넘기는 기록 수
+READ_SIZE = 1024 * 1024         # JSON 배열 파일을 읽는 단위 (글자)
+MAX_RECORD_SIZE = 16 * 1024 * 1024   # JSON 배열 파일의 기록 하나 최대 크기 (글자)
+NO_DATE = '날짜 없음'
+
+
+def new_counters():
+    """부분 집계용 빈 카운터 묶음"""
+    return {
+        'records': Counter(),        # total / unanswered / invalid
+        'topics': Counter(),         # 주제 -> 횟수
+        'trends': Counter(),         # (월, 주제) -> 횟수
+        'universities': Counter(),
+        'majors': Counter(),
+        'grades': Counter(),         # 0.5등급 단위 구간 -> 횟수
+    }
+
+
+def merge_counters(total, partial):
+    """부분 집계를 전체 집계에 합침"""
+    for key, counter in partial.items():
+        total[key].update(counter)
+    return total
+
+
+def _grade_bucket(grade):
+    """등급을 0.5 단위 구간 문자열로 변환 (예: 2.3 -> '2.0~2.5')"""
+    low = int(grade * 2) / 2
+    return f"{low:.1f}~{low + 0.5:.1f}"
+
+
+def analyze_records(records, counters=None):
+    """기록 스트림을 한 번 훑으며 집계 (질문마다 주제 분류는 한 번만)"""
+    if counters is None:
+        counters = new_counters()
+
+    for item in records:
+        if not isinstance(item, dict) or not isinstance(item.get('question'), str):
+            counters['records']['invalid'] += 1
+            continue
+
+        question = item['question']
+        response = item.get('response') or ''
+        counters['records']['total'] += 1
+        unanswered = item.get('unanswered') or not response or is_unknown_response(response)
+        if unanswered:
+            counters['records']['unanswered'] += 1
+
+        month = str(item.get('timestamp') or '')[:7] or NO_DATE
+        for topic in question_topics(question):
+            counters['topics'][topic] += 1
+            counters['trends'][(month, topic)] += 1
+
+        # 답하지 못한 질문은 요약이 없으므로 대학 / 학과 집계에서 제외
+        summary = '' if unanswered else item.get('summary') or summarize_chat(question, response)
+        for name in SUMMARY_UNIVERSITIES:
+            if summary == f"{name}학교 정보":
+                counters['universities'][name] += 1
+        for name in SUMMARY_MAJORS:
+            if summary == f"{name} 정보":
+                counters['majors'][name] += 1
+
+        grade = extract_grade(question)
+        if grade is not None:
+            counters['grades'][_grade_bucket(grade)] += 1
+
+    return counters
+
+
+def iter_jsonl(path, start=0, end=None):
+    """JSON Lines 파일의 [start, end) 구간에서 시작하는 줄을 기록으로 변환"""
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            # 구간 시작이 줄 중간이면 그 줄은 앞 구간 담당
+            if f.read(1) != b'\n':
+                f.readline()
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def iter_json_array(path, read_size=READ_SIZE, max_record_size=MAX_RECORD_SIZE):
+    """JSON 배열 파일을 조금씩 읽으며 원소를 하나씩 반환
+
+    버퍼 안에서 읽은 위치(pos)만 옮기고, 이미 처리한 앞부분은 다음 조각을 읽을 때만
+    잘라냅니다. 기록 하나가 max_record_size를 넘도록 끝나지 않으면 파일 끝까지 읽지 않고
+    바로 오류를 냅니다.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        started = False
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            if len(buffer) - pos > max_record_size:
+                raise ValueError(f"{path}: 기록 하나가 {max_record_size:,}글자를 넘습니다 (형식 오류일 수 있음)")
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        while True:
+            # 공백과 구분자(,)는 위치만 옮겨 건너뜀
+            while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ',')):
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"{path}: JSON 배열이 닫히지 않았습니다")
+                fill()
+                continue
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError(f"{path}: JSON 배열 형식이 아닙니다")
+                pos += 1
+                started = True
+                continue
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise
+                fill()
+                continue
+            yield item
+
+
+def _analyze_jsonl_shard(path, start, end):
+    return analyze_records(iter_jsonl(path, start, end))
+
+
+def _analyze_batch(records):
+    return analyze_records(records)
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run(paths, workers=None, shard_size=SHARD_SIZE, batch_size=BATCH_SIZE):
+    """여러 파일을 프로세스 풀로 나눠 집계한 뒤 합친 결과 반환"""
+    total = new_counters()
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = set()
+        for path in paths:
+            if path.endswith('.jsonl'):
+                size = os.path.getsize(path)
+                for start in range(0, max(size, 1), shard_size):
+                    futures.add(executor.submit(_analyze_jsonl_shard, path, start, start + shard_size))
+                continue
+
+            # JSON 배열은 순서대로 읽어야 하므로 읽기는 여기서, 집계는 워커에서.
+            # 제출 대기 중인 묶음 수를 제한해 메모리 사용량을 일정하게 유지
+            for batch in _batches(iter_json_array(path), batch_size):
+                futures.add(executor.submit(_analyze_batch, batch))
+                if len(futures) >= workers * 2:
+                    finished = next(as_completed(futures))
+                    futures.remove(finished)
+                    merge_counters(total, finished.result())
+
+        for future in as_completed(futures):
+            merge_counters(total, future.result())
+
+    return total
+
+
+def build_report(counters, top=10):
+    """집계 결과를 출력용 dict로 정리"""
+    records = counters['records']
+    total = records['total']
+    months = sorted({month for month, _ in counters['trends']})
+    return {
+        'total_questions': total,
+        'invalid_records': records['invalid'],
+        'unanswered_rate': records['unanswered'] / total if total else 0.0,
+        'topics': counters['topics'].most_common(),
+        'topic_trends': {
+            month: {topic: count for (m, topic), count in counters['trends'].items() if m == month}
+            for month in months
+        },
+        'top_universities': counters['universities'].most_common(top),
+        'top_majors': counters['majors'].most_common(top),
+        'grade_distribution': sorted(counters['grades'].items()),
+    }
+
+
+def print_report(report):
+    print(f"📊 전체 질문 수: {report['total_questions']:,}개 (잘못된 기록 {report['invalid_records']:,}개)")
+    print(f"❓ 답하지 못한 질문 비율: {report['unanswered_rate']:.1%}")
+
+    print("\n🔥 주제별 질문 수")
+    for topic, count in report['topics']:
+        print(f"  - {topic}: {count:,}회")
+
+    print("\n📈 월별 주제 추이")
+    for month, topics in report['topic_trends'].items():
+        summary = ", ".join(f"{t} {c:,}" for t, c in sorted(topics.items(), key=lambda x: -x[1]))
+        print(f"  {month}: {summary}")
+
+    print("\n🏫 많이 물어본 대학")
+    for name, count in report['top_universities']:
+        print(f"  - {name}: {count:,}회")
+
+    print("\n📚 많이 물어본 학과")
+    for name, count in report['top_majors']:
+        print(f"  - {name}: {count:,}회")
+
+    print("\n🎯 내신 등급 분포")
+    for bucket, count in report['grade_distribution']:
+        print(f"  {bucket}등급: {count:,}회")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='대화 기록 오프라인 분석')
+    parser.add_argument('paths', nargs='+', help='대화 기록 파일 (.jsonl 또는 JSON 배열 .json)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--top', type=int, default=10, help='대학/학과 순위 개수')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.paths if not os.path.exists(p)]
+    if missing:
+        parser.error(f"파일을 찾을 수 없습니다: {', '.join(missing)}")
+
+    report = build_report(run(args.paths, args.workers), args.top)
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""대학-분야 연결 표와 역색인
+
+university_info.csv의 주요학과('공학/의학/경영')를 불러올 때 한 번만 나눠서
+(대학, 분야, 순위) 연결 표로 만들고, 양방향 색인을 둡니다.
+
+- 분야 -> 대학 (행 번호 배열)
+- 대학 -> 분야 목록
+
+"공학이 강한 대학" 같은 질문이나 적성검사 결과 -> 추천 학과 -> 대학 추천을
+문자열 검색 없이 색인 조회와 표 결합(merge)으로 처리합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from query_engine import table_version
+
+# 학과 분야(major_info.csv) -> 대학 주요학과에서 쓰는 분야 이름들
+FIELD_ALIASES = {
+    '공학': ['공학', 'IT', '전자', '기술'],
+    '의학': ['의학', '간호', '수의학'],
+    '사회과학': ['경제', '사회복지', '국제학'],
+    '예술': ['예술', '디자인'],
+    '경영': ['경영', '호텔경영'],
+}
+
+# (대학 표 버전) -> FieldIndex
+_INDEX_CACHE = {}
+
+
+class FieldIndex:
+    """대학 x 분야 연결 표와 역색인"""
+
+    def __init__(self, university_df):
+        fields = university_df['주요학과'].fillna('').str.split('/')
+        positions = np.repeat(np.arange(len(university_df)), fields.str.len())
+        exploded = fields.explode().str.strip().to_numpy()
+        # 같은 대학 안에서 몇 번째로 적힌 분야인지 (앞에 있을수록 대표 분야)
+        ranks = pd.Series(positions).groupby(positions).cumcount().to_numpy() + 1
+
+        links = pd.DataFrame({
+            '행번호': positions,
+            '대학명': university_df['대학명'].to_numpy()[positions],
+            '분야': exploded,
+            '순위': ranks,
+        })
+        self.links = links[links['분야'] != ''].reset_index(drop=True)
+
+        self.field_rows = {
+            field: group.to_numpy()
+            for field, group in self.links.groupby('분야')['행번호']
+        }
+        self.university_fields = {
+            name: list(group)
+            for name, group in self.links.groupby('대학명', sort=False)['분야']
+        }
+
+    @property
+    def fields(self):
+        """등록된 분야 이름 목록"""
+        return list(self.field_rows)
+
+    def universities_for(self, field):
+        """분야 하나에 해당하는 대학 행 번호 배열"""
+        return self.field_rows.get(field, np.array([], dtype=int))
+
+    def fields_for(self, university_name):
+        """대학 하나의 분야 목록"""
+        return self.university_fields.get(university_name, [])
+
+    def links_for_fields(self, fields):
+        """여러 분야에 해당하는 연결 표 행"""
+        return self.links[self.links['분야'].isin(fields)]
+
+
+def get_field_index(university_df):
+    """대학-분야 색인 조회 (대학 표가 바뀐 경우에만 다시 생성)"""
+    version = table_version(university_df)
+    index = _INDEX_CACHE.get(version)
+    if index is None:
+        # 다른 스레드가 동시에 캐시를 비울 수 있으므로 만든 색인을 그대로 반환
+        index = FieldIndex(university_df)
+        _INDEX_CACHE.clear()
+        _INDEX_CACHE[version] = index
+    return index
+
+
+def expand_field(field):
+    """학과 분야 이름을 대학 분야 이름 목록으로 변환"""
+    return FIELD_ALIASES.get(field, [field])
+
+
+def universities_by_field(field, university_df, limit=None):
+    """분야가 강한 대학 (대표 분야로 적힌 순서 -> 취업률 순)"""
+    index = get_field_index(university_df)
+    links = index.links_for_fields(expand_field(field))
+    if links.empty:
+        return university_df.iloc[0:0]
+
+    best = links.groupby('행번호')['순위'].min()
+    result = university_df.iloc[best.index].assign(분야순위=best.to_numpy())
+    result = result.sort_values(['분야순위', '취업률'], ascending=[True, False])
+    return result.head(limit) if limit else result
+
+
+def recommend_universities(major_names, major_df, university_df, per_major=3):
+    """추천 학과 -> 분야 -> 대학 추천 표 (학과별 상위 per_major개)
+
+    반환 열: 학과명, 분야, 대학명, 위치, 평균등급, 취업률, 분야순위
+    """
+    majors = major_df.loc[major_df['학과명'].isin(major_names), ['학과명', '분야']]
+    if majors.empty:
+        return pd.DataFrame(columns=['학과명', '분야', '대학명', '위치', '평균등급', '취업률', '분야순위'])
+
+    # 학과 분야 -> 대학 분야 이름 (한 학과가 여러 대학 분야에 대응할 수 있음)
+    alias_df = pd.DataFrame(
+        [(field, alias) for field in majors['분야'].unique() for alias in expand_field(field)],
+        columns=['분야', '대학분야']
+    )
+    index = get_field_index(university_df)
+    links = index.links.rename(columns={'분야': '대학분야', '순위': '분야순위'})
+
+    joined = (
+        majors.merge(alias_df, on='분야')
+        .merge(links, on='대학분야')
+        .sort_values('분야순위')
+        .drop_duplicates(['학과명', '행번호'])
+    )
+    university_cols = university_df[['위치', '평균등급', '취업률']].reset_index(drop=True)
+    joined = joined.join(university_cols, on='행번호')
+
+    joined = joined.sort_values(['학과명', '분야순위', '취업률'], ascending=[True, True, False])
+    joined = joined.groupby('학과명', sort=False).head(per_major)
+
+    # 원래 추천 학과 순서 유지
+    order = {name: i for i, name in enumerate(major_names)}
+    joined = joined.sort_values('학과명', key=lambda col: col.map(order), kind='stable')
+    return joined[['학과명', '분야', '대학명', '위치', '평균등급', '취업률', '분야순위']].reset_index(drop=True)
@@ -0,0 +1,188 @@
+"""대화 기록 지연 저장 (write-behind)
+
+답변을 보여주는 화면 갱신(st.rerun)이 파일 쓰기를 기다리지 않도록,
+저장할 대화 기록은 큐에 넣기만 하고 백그라운드 스레드가 모아서 한 번에 씁니다.
+
+- 모인 기록이 BATCH_SIZE개가 되거나 FLUSH_INTERVAL초가 지나면 저장
+- 프로그램 종료 시 남은 기록 저장
+- 같은 프로세스의 스레드끼리는 락으로, 다른 프로세스끼리는 파일 잠금으로 쓰기를 직렬화
+"""
+import atexit
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+HISTORY_FILE = 'data/chat_history.json'
+MAX_HISTORY = 50       # 파일에 유지할 최근 기록 수
+BATCH_SIZE = 20        # 이만큼 모이면 바로 저장
+FLUSH_INTERVAL = 2.0   # 최대 대기 시간 (초)
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _history_lock(history_file):
+    """여러 프로세스(세션)가 동시에 기록 파일을 고치지 못하도록 잠금"""
+    directory = os.path.dirname(history_file) or '.'
+    os.makedirs(directory, exist_ok=True)
+    with open(history_file + '.lock', 'a+') as lock:
+        _lock_file(lock)
+        try:
+            yield
+        finally:
+            _unlock_file(lock)
+
+
+def read_history(history_file=HISTORY_FILE):
+    """기록 파일 읽기"""
+    if os.path.exists(history_file):
+        with open(history_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return []
+
+
+def append_history(items, history_file=HISTORY_FILE):
+    """기록 여러 개를 한 번에 파일에 추가 (임시 파일에 쓴 뒤 교체)"""
+    if not items:
+        return
+    with _history_lock(history_file):
+        history = read_history(history_file)
+        history.extend(items)
+        history = history[-MAX_HISTORY:]
+
+        directory = os.path.dirname(history_file) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(history, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, history_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class HistoryWriter:
+    """대화 기록을 큐에 모았다가 백그라운드 스레드에서 저장"""
+
+    def __init__(self, history_file=HISTORY_FILE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.history_file = history_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._pending = []                 # 아직 파일에 쓰이지 않은 기록 (읽기용)
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._unsaved = []                 # 백그라운드 스레드가 멈출 때 저장하지 못한 기록
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """기록 추가 (파일 쓰기를 기다리지 않고 바로 반환)"""
+        with self._pending_lock:
+            self._pending.append(item)
+            self._queue.put(item)
+
+    def pending(self):
+        """아직 저장되지 않은 기록 목록"""
+        with self._pending_lock:
+            return list(self._pending)
+
+    def _write(self, batch):
+        """배치 저장. 실패하면 기록을 대기 목록에 그대로 두고 False 반환"""
+        with self._write_lock:
+            try:
+                append_history(batch, self.history_file)
+            except (OSError, ValueError) as e:
+                print(f"Warning: chat history could not be saved, will retry: {e}")
+                return False
+        with self._pending_lock:
+            del self._pending[:len(batch)]
+        return True
+
+    def _drain(self, batch, deadline):
+        """큐에서 배치 크기나 마감 시간까지 기록을 모음"""
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        # 저장에 실패한 배치는 버리지 않고 다음 배치 앞에 붙여 다시 시도
+        batch = []
+        while not self._stopped.is_set():
+            if not batch:
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+            elif self._stopped.wait(self.flush_interval):
+                break
+            batch = self._drain(batch, time.monotonic() + self.flush_interval)
+            if self._write(batch):
+                batch = []
+        self._unsaved = batch
+
+    def flush(self):
+        """큐에 남은 기록을 지금 바로 저장 (실패한 기록은 다음 flush 때 다시 시도)"""
+        batch = self._unsaved
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch and self._write(batch):
+            batch = []
+        self._unsaved = batch
+
+    def close(self):
+        """백그라운드 스레드를 멈추고 남은 기록 저장"""
+        self._stopped.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_history_writer():
+    """프로세스 전체에서 공유하는 기록 저장기"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = HistoryWriter()
+            atexit.register(_writer.close)
+        return _writer
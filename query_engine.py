@@ -0,0 +1,336 @@
+"""복합 조건 질문 처리 (질의 파서 / 실행기)
+
+"취업률 90% 이상 공학 계열 학과 연봉순", "대전 지역 2등급대 대학" 처럼
+여러 조건이 섞인 질문을 조건(분야, 위치, 수치 범위) + 정렬/개수 제한으로 바꾸고,
+컬럼별로 미리 만들어 둔 정렬 인덱스와 범주 코드로 한 번에 걸러냅니다.
+"""
+import itertools
+import re
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# 질문에 나오는 표현 -> 실제 컬럼명
+NUMERIC_ALIASES = {
+    '취업률': '취업률',
+    '평균연봉': '평균연봉',
+    '연봉': '평균연봉',
+    '평균등급': '평균등급',
+    '등급': '평균등급',
+    '학생수': '학생수',
+}
+
+# 정렬 기본 방향 (True = 오름차순). 등급은 숫자가 작을수록 좋으므로 오름차순
+DEFAULT_ASCENDING = {
+    '취업률': False,
+    '평균연봉': False,
+    '평균등급': True,
+    '학생수': False,
+}
+
+# 테이블별 인덱스를 만들 컬럼
+TABLE_COLUMNS = {
+    'university': {'numeric': ['평균등급', '취업률', '학생수'], 'categorical': ['위치']},
+    'major': {'numeric': ['평균연봉', '취업률'], 'categorical': ['분야']},
+}
+
+_ALIAS_PATTERN = '|'.join(sorted(NUMERIC_ALIASES, key=len, reverse=True))
+_RANGE_PATTERN = re.compile(
+    rf'({_ALIAS_PATTERN})\s*(?:이|가|은|는)?\s*(\d+(?:\.\d+)?)\s*(?:%|만원|명|등급)?\s*(이상|이하|초과|미만)'
+)
+_GRADE_BAND_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*등급대')
+_SORT_PATTERN = re.compile(
+    rf'({_ALIAS_PATTERN})\s*(?:이|가)?\s*(높은|낮은|많은|적은|좋은)?\s*순'
+)
+_LIMIT_PATTERN = re.compile(r'(상위|하위|top|bottom)\s*(\d+)|(\d+)\s*(?:개|곳)', re.IGNORECASE)
+
+# 데이터프레임 id -> 버전 토큰
+_VERSIONS = {}
+_version_counter = itertools.count(1)
+
+# 인덱스 캐시: 테이블 이름 -> (데이터 버전, TableIndex)
+_INDEX_CACHE = {}
+# 조건별 부분 결과(마스크) 캐시 크기
+MASK_CACHE_SIZE = 256
+
+
+def table_version(df):
+    """데이터프레임 버전 토큰
+
+    불러온 표는 고치지 않고 새 데이터는 새 데이터프레임으로 넘긴다는 전제로,
+    데이터프레임 객체마다 처음 볼 때 번호를 하나 붙이고 이후에는 그 번호를 그대로 씁니다.
+    (내용을 해시하지 않으므로 호출 비용이 거의 없음)
+    """
+    key = id(df)
+    version = _VERSIONS.get(key)
+    if version is None:
+        version = next(_version_counter)
+        _VERSIONS[key] = version
+        # 객체가 사라지면 번호도 지워서 id 재사용 시 같은 번호가 붙지 않게 함
+        weakref.finalize(df, _VERSIONS.pop, key, None)
+    return version
+
+
+class TableIndex:
+    """테이블 하나에 대한 컬럼 인덱스와 조건 마스크 캐시"""
+
+    def __init__(self, df, numeric_columns, categorical_columns, field_rows=None):
+        self.size = len(df)
+        self.sorted = {}
+        self.codes = {}
+        # '공학/의학/경영' 처럼 여러 분야가 묶인 컬럼: 분야 -> 행 번호 배열
+        self.fields = field_rows or {}
+        self._mask_cache = OrderedDict()
+
+        for col in numeric_columns:
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')
+            self.sorted[col] = (order, values[order])
+
+        for col in categorical_columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            self.codes[col] = (codes, {value: i for i, value in enumerate(uniques)})
+
+    def categories(self, column):
+        """범주형 컬럼의 값 목록"""
+        if column in self.codes:
+            return list(self.codes[column][1])
+        if column == '분야':
+            return list(self.fields)
+        return []
+
+    def mask(self, predicate):
+        """조건 하나에 대한 불리언 마스크 (같은 조건은 캐시 재사용)"""
+        if predicate in self._mask_cache:
+            self._mask_cache.move_to_end(predicate)
+            return self._mask_cache[predicate]
+
+        kind, column, value = predicate
+        if kind == 'range':
+            result = self._range_mask(column, *value)
+        else:
+            result = self._in_mask(column, value)
+
+        result.setflags(write=False)
+        self._mask_cache[predicate] = result
+        if len(self._mask_cache) > MASK_CACHE_SIZE:
+            self._mask_cache.popitem(last=False)
+        return result
+
+    def _range_mask(self, column, low, high, include_low, include_high):
+        mask = np.zeros(self.size, dtype=bool)
+        if column not in self.sorted:
+            return mask
+        order, values = self.sorted[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left' if include_low else 'right')
+        end = len(values) if high is None else np.searchsorted(values, high, side='right' if include_high else 'left')
+        mask[order[start:end]] = True
+        return mask
+
+    def _in_mask(self, column, values):
+        if column in self.codes:
+            codes, lookup = self.codes[column]
+            wanted = [lookup[v] for v in values if v in lookup]
+            return np.isin(codes, wanted)
+        mask = np.zeros(self.size, dtype=bool)
+        for value in values:
+            rows = self.fields.get(value)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def order(self, column, ascending):
+        """정렬 인덱스를 이용한 행 순서 (NaN은 항상 뒤로)"""
+        order, values = self.sorted[column]
+        valid = order[~np.isnan(values)]
+        missing = order[np.isnan(values)]
+        if not ascending:
+            valid = valid[::-1]
+        return np.concatenate([valid, missing])
+
+
+def get_table_index(name, df):
+    """테이블 인덱스 조회 (데이터가 바뀌었을 때만 새로 생성)"""
+    version = table_version(df)
+    cached = _INDEX_CACHE.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    columns = TABLE_COLUMNS[name]
+    if name == 'university':
+        from field_index import get_field_index
+        field_rows = get_field_index(df).field_rows
+        index = TableIndex(df, columns['numeric'], columns['categorical'], field_rows=field_rows)
+    else:
+        index = TableIndex(df, columns['numeric'], columns['categorical'])
+    _INDEX_CACHE[name] = (version, index)
+    return index
+
+
+def _strip_names(question, names):
+    """대학명/학과명을 지워서 '서울대학교'의 '서울' 같은 오탐 방지"""
+    for name in sorted(names, key=len, reverse=True):
+        question = question.replace(name, ' ')
+    return question
+
+
+def parse_query(question, university_df, major_df):
+    """질문을 실행 계획(dict)으로 변환
+
+    반환값 예시::
+
+        {'table': 'major',
+         'predicates': [('range', '취업률', (90.0, None, True, True)), ('in', '분야', ('공학',))],
+         'sort': ('평균연봉', False),
+         'limit': None,
+         'bottom': False}
+
+    bottom=True면 정렬 결과의 뒤쪽(하위) limit개를 가리킵니다.
+    """
+    text = question
+
+    # 대상 테이블 결정
+    if any(word in text for word in ['학과', '전공', '연봉']):
+        table = 'major'
+    elif any(word in text for word in ['대학', '학교', '등급', '지역']):
+        table = 'university'
+    else:
+        return None
+
+    predicates = []
+
+    # 수치 범위 조건
+    for alias, number, op in _RANGE_PATTERN.findall(text):
+        column = NUMERIC_ALIASES[alias]
+        number = float(number)
+        if op in ('이상', '초과'):
+            bounds = (number, None, op == '이상', True)
+        else:
+            bounds = (None, number, True, op == '이하')
+        predicates.append(('range', column, bounds))
+
+    if table == 'university':
+        for number in _GRADE_BAND_PATTERN.findall(text):
+            low = float(number)
+            predicates.append(('range', '평균등급', (low, low + 1, True, False)))
+
+    # 범주 조건 (대학명/학과명 안의 글자는 제외하고 검사)
+    names = list(university_df['대학명']) + list(major_df['학과명'])
+    stripped = _strip_names(text, names)
+    df = university_df if table == 'university' else major_df
+    index = get_table_index(table, df)
+
+    fields = tuple(f for f in index.categories('분야') if f in stripped)
+    if fields:
+        predicates.append(('in', '분야', fields))
+
+    if table == 'university':
+        locations = tuple(loc for loc in index.categories('위치')
+                          if loc in stripped and f'인{loc}' not in stripped)
+        if locations:
+            predicates.append(('in', '위치', locations))
+
+    # 정렬
+    sort = None
+    match = _SORT_PATTERN.search(text)
+    if match:
+        column = NUMERIC_ALIASES[match.group(1)]
+        ascending = DEFAULT_ASCENDING[column]
+        if match.group(2) in ('높은', '많은'):
+            ascending = False
+        elif match.group(2) == '낮은' or match.group(2) == '적은':
+            ascending = True
+        if column in index.sorted:
+            sort = (column, ascending)
+
+    # 개수 제한
+    limit = None
+    bottom = False
+    match = _LIMIT_PATTERN.search(text)
+    if match:
+        limit = int(match.group(2) or match.group(3))
+        bottom = (match.group(1) or '').lower() in ('하위', 'bottom')
+
+    # 인덱스가 없는 컬럼 조건은 버림 (예: 학과 테이블의 등급 조건)
+    predicates = [p for p in predicates
+                  if (p[0] == 'range' and p[1] in index.sorted) or p[0] == 'in']
+
+    # 질문에 특정 대학명/학과명이 들어 있는지 (이름을 지운 결과가 원문과 다르면 포함)
+    named = stripped != text
+
+    return {'table': table, 'predicates': predicates, 'sort': sort, 'limit': limit,
+            'bottom': bottom, 'named': named}
+
+
+def is_compound(plan):
+    """기존 키워드 응답으로는 답할 수 없는 복합 질문인지
+
+    수치 범위나 정렬 조건이 있거나, 범주 조건이 두 개 이상이면 복합 질문으로 봅니다.
+    단, "서울대학교 취업률 순위"처럼 특정 대학/학과를 가리키면서 정렬 조건만 있는 질문은
+    기존 대학/학과 정보 응답으로 넘깁니다.
+    """
+    if plan is None:
+        return False
+    if plan.get('named') and not plan['predicates']:
+        return False
+    if plan['sort'] is not None or any(kind == 'range' for kind, _, _ in plan['predicates']):
+        return True
+    return len(plan['predicates']) >= 2
+
+
+def run_query(plan, university_df, major_df):
+    """실행 계획을 마스크 연산으로 수행하여 결과 데이터프레임 반환"""
+    df = university_df if plan['table'] == 'university' else major_df
+    index = get_table_index(plan['table'], df)
+
+    mask = np.ones(len(df), dtype=bool)
+    # 선택도가 높은(걸러지는 행이 많은) 조건부터 적용
+    masks = sorted((index.mask(p) for p in plan['predicates']), key=np.count_nonzero)
+    for predicate_mask in masks:
+        mask &= predicate_mask
+        if not mask.any():
+            break
+
+    if plan['sort'] is not None:
+        column, ascending = plan['sort']
+        rows = index.order(column, ascending)
+        rows = rows[mask[rows]]
+    else:
+        rows = np.flatnonzero(mask)
+
+    if plan['limit']:
+        if plan.get('bottom'):
+            # 하위 N개: 뒤에서 N개를 가장 낮은 것부터
+            rows = rows[-plan['limit']:][::-1]
+        else:
+            rows = rows[:plan['limit']]
+
+    return df.iloc[rows]
+
+
+def describe_plan(plan):
+    """실행 계획을 사람이 읽을 수 있는 조건 문자열로 변환"""
+    parts = []
+    for kind, column, value in plan['predicates']:
+        if kind == 'in':
+            parts.append(f"{column}: {', '.join(value)}")
+            continue
+        low, high, include_low, include_high = value
+        if low is not None and high is not None:
+            parts.append(f"{column} {low:g}~{high:g}{'' if include_high else ' 미만'}")
+        elif low is not None:
+            parts.append(f"{column} {low:g} {'이상' if include_low else '초과'}")
+        else:
+            parts.append(f"{column} {high:g} {'이하' if include_high else '미만'}")
+    if plan['sort'] is not None:
+        column, ascending = plan['sort']
+        parts.append(f"{column} {'낮은' if ascending else '높은'} 순")
+    if plan['limit']:
+        parts.append(f"{'하위' if plan.get('bottom') else '상위'} {plan['limit']}개")
+    return ' / '.join(parts)
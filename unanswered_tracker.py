@@ -0,0 +1,130 @@
+"""답하지 못한 질문 추적
+
+챗봇이 "찾지 못하겠습니다"라고 답한 질문을 정규화해서 세고, 가장 많이 나온 질문을 보여줍니다.
+빈도는 count-min sketch로, 상위 질문은 크기가 고정된 top-k 힙으로 관리하므로
+질문이 아무리 많이 들어와도 메모리 사용량은 일정합니다. (빈도는 약간 크게 추정될 수 있음)
+"""
+import csv
+import hashlib
+import heapq
+import io
+import re
+import threading
+
+import numpy as np
+
+SKETCH_WIDTH = 2048   # 행마다 카운터 수 (클수록 오차가 작아짐)
+SKETCH_DEPTH = 4      # 해시 함수 수 (클수록 오차 확률이 작아짐)
+TOP_K = 50            # 기억할 상위 질문 수
+
+_PUNCTUATION = re.compile(r'[?!.,~…\'"“”‘’()\[\]]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_question(question):
+    """대소문자 / 문장부호 / 공백 차이를 없앤 질문"""
+    text = _PUNCTUATION.sub(' ', question.lower())
+    return _SPACES.sub(' ', text).strip()
+
+
+class CountMinSketch:
+    """고정 크기 빈도 추정기"""
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key):
+        # 해시 하나에서 두 값을 뽑아 depth개의 위치를 만듦 (double hashing)
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(h1 + i * h2) % self.width for i in range(self.depth)])
+
+    def add(self, key, count=1):
+        """빈도를 더하고 새 추정값 반환"""
+        columns = self._columns(key)
+        self.table[self._rows, columns] += count
+        return int(self.table[self._rows, columns].min())
+
+    def estimate(self, key):
+        return int(self.table[self._rows, self._columns(key)].min())
+
+
+class UnansweredTracker:
+    """답하지 못한 질문의 빈도 추정 + 상위 k개 유지"""
+
+    def __init__(self, top_k=TOP_K, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.top_k = top_k
+        self.sketch = CountMinSketch(width, depth)
+        self.total = 0
+        self._top = {}      # 질문 -> (추정 빈도, 원래 질문 예시)
+        self._heap = []     # (추정 빈도, 질문) 최소 힙 (오래된 항목은 꺼낼 때 무시)
+        self._lock = threading.Lock()
+
+    def add(self, question):
+        """답하지 못한 질문 하나 기록"""
+        key = normalize_question(question)
+        if not key:
+            return
+        with self._lock:
+            self.total += 1
+            count = self.sketch.add(key)
+
+            if key in self._top:
+                self._top[key] = (count, self._top[key][1])
+                heapq.heappush(self._heap, (count, key))
+            elif len(self._top) < self.top_k:
+                self._top[key] = (count, question.strip())
+                heapq.heappush(self._heap, (count, key))
+            else:
+                min_count, min_key = self._peek_min()
+                if count > min_count:
+                    heapq.heappop(self._heap)
+                    del self._top[min_key]
+                    self._top[key] = (count, question.strip())
+                    heapq.heappush(self._heap, (count, key))
+
+            # 오래된 힙 항목이 너무 쌓이면 다시 만듦
+            if len(self._heap) > self.top_k * 4:
+                self._heap = [(count, key) for key, (count, _) in self._top.items()]
+                heapq.heapify(self._heap)
+
+    def _peek_min(self):
+        """힙의 최솟값 (현재 값과 다른 오래된 항목은 버림)"""
+        while True:
+            count, key = self._heap[0]
+            if key in self._top and self._top[key][0] == count:
+                return count, key
+            heapq.heappop(self._heap)
+
+    def top(self, n=None):
+        """상위 질문 목록 [(질문 예시, 정규화된 질문, 추정 빈도), ...]"""
+        with self._lock:
+            items = sorted(self._top.items(), key=lambda item: -item[1][0])
+        if n is not None:
+            items = items[:n]
+        return [(example, key, count) for key, (count, example) in items]
+
+    def to_csv(self):
+        """상위 질문 목록을 CSV 문자열로 내보내기"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['질문', '정규화된 질문', '추정 횟수'])
+        writer.writerows(self.top())
+        return output.getvalue()
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_unanswered_tracker():
+    """프로세스 전체에서 공유하는 추적기"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = UnansweredTracker()
+        return _tracker
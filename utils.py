@@ -1,4 +1,5 @@
 """유틸리티 함수들"""
+import numpy as np
 import pandas as pd
 try:
     import plotly.express as px
@@ -11,8 +12,12 @@ except ImportError as e:
     px = None
     go = None
 from collections import Counter
-import json
-import os
+from query_engine import parse_query, is_compound, run_query, describe_plan
+from aggregates import get_table_views
+from admission_series import get_admission_store
+from history_writer import get_history_writer, read_history, MAX_HISTORY
+from field_index import get_field_index, universities_by_field, FIELD_ALIASES
+from admission_scoring import score_admission, BAND_LABELS
 
 def load_data():
     """데이터 로드"""
@@ -62,6 +67,26 @@ def get_response(question, university_df, major_df, admission_df):
     """질문에 대한 응답 생성"""
     category = analyze_question(question)
     
+    # 분야별 / 지역별 통계 질문
+    if any(word in question for word in ['분야별', '계열별']):
+        by_field = get_table_views('major', major_df)['by_field']
+        return format_group_stats('분야별 학과 통계', by_field, ['취업률', '평균연봉'])
+    if any(word in question for word in ['지역별', '위치별']):
+        by_location = get_table_views('university', university_df)['by_location']
+        return format_group_stats('지역별 대학 통계', by_location, ['취업률', '평균등급'])
+    
+    # 내신 질문은 등급을 반영해야 하므로 아래 내신 분석으로 바로 넘어감
+    if category != '내신':
+        # 분야가 강한 대학 (예: "공학이 강한 대학")
+        field = extract_strong_field(question, university_df)
+        if field is not None:
+            return format_field_universities(field, universities_by_field(field, university_df))
+        
+        # 복합 조건 질문 (예: "취업률 90% 이상 공학 계열 학과 연봉순")
+        plan = parse_query(question, university_df, major_df)
+        if is_compound(plan):
+            return format_query_result(plan, run_query(plan, university_df, major_df))
+    
     if category == '내신':
         # 등급 추출
         user_grade = extract_grade(question)
@@ -70,41 +95,54 @@ def get_response(question, university_df, major_df, admission_df):
             response = "내신 등급을 알려주시면 갈 수 있는 대학을 추천해드릴 수 있습니다.\n예: '내신 2.5등급으로 갈 수 있는 대학 알려줘'"
             return response, False, None
         
-        # 특정 대학에 들어갈 수 있는지 확인
-        for _, row in university_df.iterrows():
-            if row['대학명'] in question:
-                required_grade = row['평균등급']
-                if user_grade <= required_grade + 0.3:  # 0.3등급 여유
-                    response = f"""
+        # 모든 대학의 합격 가능성을 한 번에 계산
+        scores = score_admission(user_grade, university_df, include_all=True)
+        
+        # 특정 대학에 들어갈 수 있는지 확인 (이름 배열에서 질문에 들어 있는 첫 대학)
+        names = university_df['대학명'].to_numpy()
+        hits = np.flatnonzero(np.fromiter((name in question for name in names), dtype=bool, count=len(names)))
+        if len(hits) > 0:
+            row = university_df.iloc[hits[0]]
+            # 대학마다 한 행 (학과별 결과만 있으면 가장 가능성이 높은 학과 기준)
+            score = scores[scores['대학명'] == row['대학명']].iloc[0]
+            required_grade = score['평균등급']
+            band = score['구분']
+            chance = f"약 {score['합격확률']:.0%}"
+            program = score.get('학과명', '')
+            basis = f"\n🏫 **기준 학과**: {program} (학과별 결과 중 가장 가능성이 높은 학과)" if program else ""
+            if band:
+                response = f"""
 **{row['대학명']}** 입학 가능성 분석:
 
 📊 **내신 등급**: {user_grade}등급
-🎯 **필요 등급**: {required_grade}등급
+🎯 **필요 등급**: {required_grade}등급{basis}
 ✅ **결과**: 입학 가능성이 있습니다! (필요 등급보다 {'높습니다' if user_grade < required_grade else '비슷합니다'})
+📈 **합격 가능성**: {chance} ({BAND_LABELS[band]})
 
 📍 **위치**: {row['위치']}
 💼 **취업률**: {row['취업률']}%
 🎓 **주요학과**: {row['주요학과']}
 """
-                else:
-                    response = f"""
+            else:
+                response = f"""
 **{row['대학명']}** 입학 가능성 분석:
 
 📊 **내신 등급**: {user_grade}등급
-🎯 **필요 등급**: {required_grade}등급
+🎯 **필요 등급**: {required_grade}등급{basis}
 ❌ **결과**: 입학이 어려울 수 있습니다. (필요 등급보다 {user_grade - required_grade:.1f}등급 낮습니다)
+📈 **합격 가능성**: {chance}
 
 다른 대학을 추천해드릴까요?
 """
-                return response, True, 'grade_analysis'
+            return response, True, 'grade_analysis'
         
         # 내신으로 갈 수 있는 대학 추천
-        # 인서울 대학만 필터링
-        seoul_universities = university_df[university_df['위치'] == '서울'].copy()
-        # 내신보다 높은 등급이 필요한 대학 제외 (0.3등급 여유)
-        available_universities = seoul_universities[
-            seoul_universities['평균등급'] >= user_grade - 0.3
-        ].sort_values('평균등급')
+        # 인서울 대학만 필터링 (도전 기준 밖의 대학은 제외, 도전 -> 적정 -> 안전 순)
+        seoul_names = set(university_df.loc[university_df['위치'] == '서울', '대학명'])
+        available = scores[(scores['구분'] != '') & scores['대학명'].isin(seoul_names)]
+        available_universities = available.merge(
+            university_df[['대학명', '취업률', '주요학과']], on='대학명', how='left'
+        )
         
         if len(available_universities) > 0:
             response = f"""
@@ -112,16 +150,9 @@ def get_response(question, university_df, major_df, admission_df):
 
 """
             for idx, (_, row) in enumerate(available_universities.head(10).iterrows(), 1):
-                # 안전성 표시
-                if user_grade <= row['평균등급']:
-                    safety = "✅ 안전"
-                elif user_grade <= row['평균등급'] + 0.2:
-                    safety = "⚠️ 적정"
-                else:
-                    safety = "🔶 도전"
-                
-                response += f"{idx}. **{row['대학명']}** {safety}\n"
-                response += f"   - 필요 등급: {row['평균등급']}등급\n"
+                response += f"{idx}. **{row['대학명']}** {BAND_LABELS[row['구분']]} (합격 가능성 약 {row['합격확률']:.0%})\n"
+                program = row.get('학과명', '')
+                response += f"   - 필요 등급: {row['평균등급']}등급{f' ({program} 기준)' if program else ''}\n"
                 response += f"   - 취업률: {row['취업률']}%\n"
                 response += f"   - 주요학과: {row['주요학과']}\n\n"
             
@@ -182,13 +213,15 @@ def get_response(question, university_df, major_df, admission_df):
         return response, True, 'major_list'
     
     elif category == '진학':
+        admission = get_table_views('admission', admission_df)
+        latest = admission['latest']
         response = f"""
 **대학 진학률** 정보를 알려드리겠습니다.
 
-최근 5년간 대학 진학률 추이를 확인하실 수 있습니다.
-- 2023년 전체 진학률: {admission_df.iloc[-1]['대학진학률']}%
-- 4년제 진학률: {admission_df.iloc[-1]['4년제진학률']}%
-- 전문대 진학률: {admission_df.iloc[-1]['전문대진학률']}%
+최근 {admission['count']}년간 대학 진학률 추이를 확인하실 수 있습니다.
+- {admission['latest_year']}년 전체 진학률: {latest['대학진학률']}%
+- 4년제 진학률: {latest['4년제진학률']}%
+- 전문대 진학률: {latest['전문대진학률']}%
 """
         return response, True, 'admission'
     
@@ -204,8 +237,117 @@ def get_response(question, university_df, major_df, admission_df):
         response = "죄송합니다 이 질문을 찾지 못하겠습니다 죄송합니다"
         return response, False, None
 
-def create_visualization(vis_type, university_df, major_df, admission_df):
-    """시각화 생성"""
+def extract_strong_field(question, university_df):
+    """'공학이 강한 대학' 같은 질문에서 분야 이름 추출"""
+    import re
+    match = re.search(r'([가-힣A-Za-z]+?)(?:이|가)?\s*(?:분야가?\s*)?(?:강한|유명한|잘하는)\s*(?:대학|학교)', question)
+    if not match:
+        return None
+    field = match.group(1)
+    if field in get_field_index(university_df).fields or field in FIELD_ALIASES:
+        return field
+    return None
+
+def format_field_universities(field, result_df):
+    """분야가 강한 대학 목록을 응답 문장으로 변환"""
+    if result_df.empty:
+        return f"**{field}** 분야가 강한 대학 정보를 찾지 못했습니다.", False, None
+    
+    response = f"""
+**{field}** 분야가 강한 대학교:
+
+"""
+    for idx, (_, row) in enumerate(result_df.head(10).iterrows(), 1):
+        response += f"{idx}. **{row['대학명']}** ({row['위치']})\n"
+        response += f"   - 주요학과: {row['주요학과']}\n"
+        response += f"   - 평균등급: {row['평균등급']}등급 / 취업률: {row['취업률']}%\n\n"
+    response += "💡 주요학과 중 앞에 적힌 분야일수록 대표 분야로 보고 정렬했습니다."
+    return response, True, 'university'
+
+def format_group_stats(title, summary, columns):
+    """그룹별 집계 뷰를 응답 문장으로 변환"""
+    response = f"""
+**{title}** 정보를 알려드리겠습니다.
+
+"""
+    for group, row in summary.iterrows():
+        response += f"**{group}** ({int(row[(columns[0], 'count')])}개)\n"
+        for col in columns:
+            response += f"   - {col}: 평균 {row[(col, 'mean')]:,.1f} / 중앙값 {row[(col, 'p50')]:,.1f}\n"
+        response += "\n"
+    return response, False, None
+
+def format_query_result(plan, result_df):
+    """복합 조건 질문 결과를 응답 문장으로 변환"""
+    conditions = describe_plan(plan)
+    
+    if result_df.empty:
+        response = f"조건(**{conditions}**)에 맞는 결과를 찾지 못했습니다. 조건을 조금 넓혀서 다시 질문해주세요."
+        return response, False, None
+    
+    response = f"""
+**검색 조건**: {conditions}
+
+"""
+    if plan['table'] == 'university':
+        for idx, (_, row) in enumerate(result_df.head(10).iterrows(), 1):
+            response += f"{idx}. **{row['대학명']}** ({row['위치']})\n"
+            response += f"   - 평균등급: {row['평균등급']}등급\n"
+            response += f"   - 취업률: {row['취업률']}%\n"
+            response += f"   - 주요학과: {row['주요학과']}\n\n"
+        vis_type = 'university'
+    else:
+        for idx, (_, row) in enumerate(result_df.head(10).iterrows(), 1):
+            response += f"{idx}. **{row['학과명']}** ({row['분야']})\n"
+            response += f"   - 평균연봉: {row['평균연봉']:,}만원\n"
+            response += f"   - 취업률: {row['취업률']}%\n\n"
+        vis_type = 'major'
+    
+    response += f"📊 총 **{len(result_df)}개**가 조건에 맞습니다."
+    return response, True, vis_type
+
+# 대용량 그래프 모드 기준
+LARGE_N_THRESHOLD = 100   # 행 수가 이보다 많으면 대용량 모드
+LARGE_N_TOP = 20          # 대용량 모드에서 상위/하위로 보여줄 개수
+TEXT_LABEL_LIMIT = 50     # 점마다 글자 라벨을 붙이는 최대 개수
+SCATTER_BINS = 10         # 대용량 산점도에서 축마다 나누는 칸 수
+
+def _is_large(df, large_n):
+    """대용량 모드 여부 (large_n이 None이면 행 수로 자동 판단)"""
+    if large_n is None:
+        return len(df) > LARGE_N_THRESHOLD
+    return large_n
+
+def _top_bottom_with_others(df, label_col, value_col, n, ascending=False):
+    """상위 n개 + '기타' 묶음 + 하위 n개로 줄인 표 (정렬 순서 유지)"""
+    sorted_df = df.sort_values(value_col, ascending=ascending)[[label_col, value_col]]
+    if len(sorted_df) <= n * 2:
+        return sorted_df
+    
+    others = sorted_df.iloc[n:-n]
+    others_row = pd.DataFrame({
+        label_col: [f"기타 ({len(others)}개 평균)"],
+        value_col: [others[value_col].mean()]
+    })
+    return pd.concat([sorted_df.iloc[:n], others_row, sorted_df.iloc[-n:]], ignore_index=True)
+
+def _binned_points(df, x_col, y_col, group_col, bins=SCATTER_BINS):
+    """그룹별로 x/y를 bins x bins 칸에 묶어 칸마다 평균 위치와 개수 한 점으로 줄인 표
+
+    점 수가 그룹 수 x bins x bins를 넘지 않으므로 데이터가 커져도 그래프 크기가 일정합니다.
+    """
+    x_bin = pd.cut(df[x_col], bins, labels=False).rename('x칸')
+    y_bin = pd.cut(df[y_col], bins, labels=False).rename('y칸')
+    grouped = df.groupby([df[group_col], x_bin, y_bin], observed=True)
+    points = grouped.agg(**{x_col: (x_col, 'mean'), y_col: (y_col, 'mean'), '개수': (x_col, 'size')})
+    return points.round(1).reset_index(level=group_col).reset_index(drop=True)
+
+def create_visualization(vis_type, university_df, major_df, admission_df, large_n=None):
+    """시각화 생성
+    
+    large_n: True면 대용량 모드(WebGL, 상위/하위 N개 + 기타, 글자 라벨 생략),
+    None이면 데이터 크기를 보고 자동으로 결정합니다.
+    """
     if not PLOTLY_AVAILABLE:
         # plotly가 없으면 DataFrame 반환
         if vis_type in ['university', 'major', 'admission', 'employment']:
@@ -214,7 +356,11 @@ def create_visualization(vis_type, university_df, major_df, admission_df):
     
     if vis_type == 'university':
         # 대학별 취업률 비교
-        fig = px.bar(university_df.sort_values('취업률', ascending=False),
+        if _is_large(university_df, large_n):
+            plot_df = _top_bottom_with_others(university_df, '대학명', '취업률', LARGE_N_TOP)
+        else:
+            plot_df = university_df.sort_values('취업률', ascending=False)
+        fig = px.bar(plot_df,
                      x='대학명', y='취업률',
                      title='대학별 취업률 비교',
                      labels={'취업률': '취업률 (%)', '대학명': '대학교'},
@@ -229,12 +375,25 @@ def create_visualization(vis_type, university_df, major_df, admission_df):
     
     elif vis_type == 'major':
         # 학과별 연봉 vs 취업률
+        if _is_large(major_df, large_n):
+            # 점이 많으면 가까운 학과끼리 한 점으로 묶고(점 크기 = 학과 수) 학과명은 생략
+            points = _binned_points(major_df, '평균연봉', '취업률', '분야')
+            fig = px.scatter(points, x='평균연봉', y='취업률', size='개수',
+                            title=f'학과별 평균연봉 vs 취업률 ({len(major_df):,}개 학과, 비슷한 학과끼리 묶음)',
+                            labels={'평균연봉': '평균연봉 (만원)', '취업률': '취업률 (%)', '개수': '학과 수'},
+                            color='분야',
+                            render_mode='webgl')
+            return fig
+        
+        show_text = len(major_df) <= TEXT_LABEL_LIMIT
         fig = px.scatter(major_df, x='평균연봉', y='취업률',
-                        text='학과명', size='평균연봉',
+                        text='학과명' if show_text else None,
+                        hover_name='학과명', size='평균연봉',
                         title='학과별 평균연봉 vs 취업률',
                         labels={'평균연봉': '평균연봉 (만원)', '취업률': '취업률 (%)'},
                         color='분야')
-        fig.update_traces(textposition='top center')
+        if show_text:
+            fig.update_traces(textposition='top center')
         return fig
     
     elif vis_type == 'major_list':
@@ -242,17 +401,24 @@ def create_visualization(vis_type, university_df, major_df, admission_df):
         return major_df
     
     elif vis_type == 'admission':
-        # 진학률 추이
+        # 진학률 추이 (긴 시계열은 그래프 폭에 맞춰 다운샘플링)
+        store = get_admission_store(admission_df)
+        traces = [
+            ('대학진학률', '전체 진학률', 'blue', 3),
+            ('4년제진학률', '4년제', 'green', 2),
+            ('전문대진학률', '전문대', 'orange', 2),
+        ]
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=admission_df['연도'], y=admission_df['대학진학률'],
-                                mode='lines+markers', name='전체 진학률',
-                                line=dict(color='blue', width=3)))
-        fig.add_trace(go.Scatter(x=admission_df['연도'], y=admission_df['4년제진학률'],
-                                mode='lines+markers', name='4년제',
-                                line=dict(color='green', width=2)))
-        fig.add_trace(go.Scatter(x=admission_df['연도'], y=admission_df['전문대진학률'],
-                                mode='lines+markers', name='전문대',
-                                line=dict(color='orange', width=2)))
+        for metric, name, color, width in traces:
+            if store.is_fine:
+                series = store.downsampled(metric)
+                x, mode = series.index, 'lines'
+            else:
+                series = store.yearly()[metric]
+                x, mode = series.index, 'lines+markers'
+            fig.add_trace(go.Scatter(x=x, y=series.to_numpy(),
+                                    mode=mode, name=name,
+                                    line=dict(color=color, width=width)))
         fig.update_layout(title='연도별 대학 진학률 추이',
                          xaxis_title='연도',
                          yaxis_title='진학률 (%)')
@@ -260,7 +426,11 @@ def create_visualization(vis_type, university_df, major_df, admission_df):
     
     elif vis_type == 'employment':
         # 학과별 취업률
-        fig = px.bar(major_df.sort_values('취업률', ascending=True),
+        if _is_large(major_df, large_n):
+            plot_df = _top_bottom_with_others(major_df, '학과명', '취업률', LARGE_N_TOP, ascending=True)
+        else:
+            plot_df = major_df.sort_values('취업률', ascending=True)
+        fig = px.bar(plot_df,
                      x='취업률', y='학과명',
                      orientation='h',
                      title='학과별 취업률',
@@ -281,78 +451,75 @@ def create_visualization(vis_type, university_df, major_df, admission_df):
     return None
 
 def save_chat_history(chat_item):
-    """대화 기록 저장"""
-    history_file = 'data/chat_history.json'
-    
-    if os.path.exists(history_file):
-        with open(history_file, 'r', encoding='utf-8') as f:
-            history = json.load(f)
-    else:
-        history = []
-    
-    history.append(chat_item)
-    
-    # 최근 50개만 유지
-    history = history[-50:]
-    
-    os.makedirs('data', exist_ok=True)
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+    """대화 기록 저장 (백그라운드에서 모아서 저장하므로 바로 반환)"""
+    get_history_writer().submit(chat_item)
 
 def load_chat_history():
-    """대화 기록 로드"""
-    history_file = 'data/chat_history.json'
+    """대화 기록 로드 (아직 저장 대기 중인 기록 포함)"""
+    history = read_history() + get_history_writer().pending()
+    return history[-MAX_HISTORY:]
+
+# 주제 키워드 매핑
+TOPIC_KEYWORDS = {
+    '내신 기반 추천': ['내신', '등급', '성적', '갈 수', '들어갈', '입학', '합격 가능'],
+    '대학 정보': ['대학', '학교', '캠퍼스', '서울대', '연세대', '고려대'],
+    '학과 정보': ['학과', '전공', '과', '컴퓨터', '의학', '경영', '공학'],
+    '진학률': ['진학', '입시', '합격', '진학률'],
+    '취업률': ['취업', '연봉', '취직', '직업', '취업률'],
+    '추천': ['추천', '어디', '좋은', '어떤']
+}
+
+# 요약에 쓰는 대학명 / 학과명 키워드
+SUMMARY_UNIVERSITIES = ['서울대', '연세대', '고려대', '카이스트', '포스텍', '성균관', '한양', '서강', '중앙', '경희']
+SUMMARY_MAJORS = ['컴퓨터공학', '의예과', '경영학', '전기공학', '기계공학', '경제학', '법학', '심리학', '간호학', '건축학', '디자인', '화학공학', '생명과학', '교육학']
+
+def count_topics(history):
+    """대화 기록에서 주제별 빈도 계산"""
+    topic_counts = Counter()
+    
+    for item in history:
+        if 'question' in item:
+            question = item['question']
+            for topic in question_topics(question):
+                topic_counts[topic] += 1
     
-    if os.path.exists(history_file):
-        with open(history_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
+    return topic_counts
+
+def question_topics(question):
+    """질문에 해당하는 주제 목록"""
+    return [topic for topic, keywords in TOPIC_KEYWORDS.items()
+            if any(keyword in question for keyword in keywords)]
 
 def get_popular_topics():
     """인기 검색 주제 반환 (주제 기반)"""
-    history = load_chat_history()
+    # 답하지 못한 질문은 인기 주제에서 제외
+    history = [item for item in load_chat_history() if not item.get('unanswered')]
     
     if not history:
         return []
     
-    # 주제 키워드 매핑
-    topic_keywords = {
-        '내신 기반 추천': ['내신', '등급', '성적', '갈 수', '들어갈', '입학', '합격 가능'],
-        '대학 정보': ['대학', '학교', '캠퍼스', '서울대', '연세대', '고려대'],
-        '학과 정보': ['학과', '전공', '과', '컴퓨터', '의학', '경영', '공학'],
-        '진학률': ['진학', '입시', '합격', '진학률'],
-        '취업률': ['취업', '연봉', '취직', '직업', '취업률'],
-        '추천': ['추천', '어디', '좋은', '어떤']
-    }
-    
-    # 각 주제별 빈도 계산
-    topic_counts = Counter()
-    
-    for item in history:
-        if 'question' in item:
-            question = item['question']
-            for topic, keywords in topic_keywords.items():
-                if any(keyword in question for keyword in keywords):
-                    topic_counts[topic] += 1
-    
     # 빈도순으로 정렬하여 반환
-    popular = topic_counts.most_common(5)
+    popular = count_topics(history).most_common(5)
     
     return popular
 
+def is_unknown_response(response):
+    """답을 찾지 못한 응답인지 확인"""
+    return "죄송합니다" in response and "찾지 못하겠습니다" in response
+
 def summarize_chat(question, response):
     """대화 내용 요약 (주제 기반)"""
     # 주제 추출
     if any(word in question for word in ['대학', '학교', '서울대', '연세대', '고려대']):
         # 대학명 추출 시도
-        for word in ['서울대', '연세대', '고려대', '카이스트', '포스텍', '성균관', '한양', '서강', '중앙', '경희']:
+        for word in SUMMARY_UNIVERSITIES:
             if word in question:
                 return f"{word}학교 정보"
         return "대학 정보 문의"
     
     elif any(word in question for word in ['학과', '전공', '컴퓨터', '의학', '경영', '공학']):
         # 학과명 추출 시도
-        for word in ['컴퓨터공학', '의예과', '경영학', '전기공학', '기계공학', '경제학', '법학', '심리학', '간호학', '건축학', '디자인', '화학공학', '생명과학', '교육학']:
+        for word in SUMMARY_MAJORS:
             if word in question:
                 return f"{word} 정보"
         return "학과 정보 문의"
@@ -489,8 +656,8 @@ APTITUDE_QUESTIONS = [
     }
 ]
 
-def analyze_aptitude(answers):
-    """적성검사 결과 분석"""
+def count_aptitude_types(answers):
+    """답변별 성향 유형 개수 (처음 나온 순서 유지)"""
     type_counts = Counter()
     
     for answer in answers:
@@ -501,6 +668,57 @@ def analyze_aptitude(answers):
         personality_type = question['type'][choice]
         type_counts[personality_type] += 1
     
+    return type_counts
+
+def _can_overtake(type_counts, leader, other, remaining):
+    """남은 질문을 모두 other로 답했을 때 other가 1위가 될 수 있는지
+    
+    동점이면 먼저 나온 유형이 1위가 되므로 (Counter.most_common 순서),
+    이미 leader보다 먼저 나온 유형만 동점으로 앞설 수 있습니다.
+    """
+    order = list(type_counts)
+    reach = type_counts.get(other, 0) + remaining
+    if reach > type_counts[leader]:
+        return True
+    return (reach == type_counts[leader] and other in type_counts
+            and order.index(other) < order.index(leader))
+
+def contending_aptitude_types(answers):
+    """남은 질문 결과에 따라 1위가 될 수 있는 유형 목록 (현재 1위가 맨 앞)"""
+    type_counts = count_aptitude_types(answers)
+    remaining = len(APTITUDE_QUESTIONS) - len(answers)
+    all_types = list(dict.fromkeys(t for q in APTITUDE_QUESTIONS for t in q['type'].values()))
+    
+    if not type_counts:
+        return all_types
+    
+    leader = type_counts.most_common(1)[0][0]
+    return [leader] + [t for t in all_types
+                       if t != leader and _can_overtake(type_counts, leader, t, remaining)]
+
+def is_aptitude_decided(answers):
+    """남은 질문과 상관없이 analyze_aptitude의 주 성향이 정해졌는지"""
+    return len(answers) > 0 and len(contending_aptitude_types(answers)) == 1
+
+def next_aptitude_question(answers, adaptive=True):
+    """다음에 물어볼 질문 (더 물어볼 필요가 없으면 None)
+    
+    질문은 항상 원래 순서대로 묻습니다. (모든 질문의 선택지가 같은 네 유형에 대응하므로
+    질문마다 구분력 차이가 없음) adaptive=True면 주 성향이 확정되는 즉시 멈춥니다.
+    """
+    answered = {answer['question_id'] for answer in answers}
+    remaining = [q for q in APTITUDE_QUESTIONS if q['id'] not in answered]
+    
+    if not remaining:
+        return None
+    if adaptive and is_aptitude_decided(answers):
+        return None
+    return remaining[0]
+
+def analyze_aptitude(answers):
+    """적성검사 결과 분석"""
+    type_counts = count_aptitude_types(answers)
+    
     # 가장 많이 나온 유형
     primary_type = type_counts.most_common(1)[0][0]
     
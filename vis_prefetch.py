@@ -0,0 +1,82 @@
+"""시각화 미리 만들기
+
+챗봇이 "표나 그래프를 보여줄까요?"라고 묻는 순간 백그라운드 스레드에서 그래프를 미리 만들어 두고,
+사용자가 "네"라고 답하면 이미 만들어진 결과를 바로 가져갑니다.
+
+- 같은 데이터 / 같은 종류의 그래프는 캐시에서 재사용
+- 세션마다 대기 중인 제안은 하나만 유지 (새 제안이나 "아니요"면 이전 작업 취소)
+- 작업 스레드 수와 대기 작업 수에 상한을 두어 버려진 제안이 쌓이지 않음
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from query_engine import table_version
+from utils import create_visualization
+
+MAX_WORKERS = 2       # 그래프를 만드는 스레드 수
+MAX_PENDING = 8       # 전체 대기 작업 수 상한 (넘으면 가장 오래된 제안 취소)
+CACHE_SIZE = 16       # 만들어 둔 그래프 캐시 크기
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='vis-prefetch')
+_lock = threading.Lock()
+_pending = OrderedDict()   # 세션 키 -> (캐시 키, Future)
+_cache = OrderedDict()     # 캐시 키 -> 시각화 결과
+
+
+def _cache_key(vis_type, university_df, major_df, admission_df):
+    return (vis_type, table_version(university_df), table_version(major_df), table_version(admission_df))
+
+
+def _build(key, vis_type, university_df, major_df, admission_df):
+    """시각화를 만들고 캐시에 저장"""
+    vis = create_visualization(vis_type, university_df, major_df, admission_df)
+    with _lock:
+        _cache[key] = vis
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return vis
+
+
+def _cancel_locked(session_key):
+    entry = _pending.pop(session_key, None)
+    if entry is not None:
+        entry[1].cancel()
+
+
+def prefetch_visualization(session_key, vis_type, university_df, major_df, admission_df):
+    """제안한 시각화를 백그라운드에서 미리 만들기 시작"""
+    key = _cache_key(vis_type, university_df, major_df, admission_df)
+    with _lock:
+        _cancel_locked(session_key)
+        if key in _cache:
+            return
+
+        while len(_pending) >= MAX_PENDING:
+            _cancel_locked(next(iter(_pending)))
+
+        future = _executor.submit(_build, key, vis_type, university_df, major_df, admission_df)
+        _pending[session_key] = (key, future)
+
+
+def cancel_visualization(session_key):
+    """제안이 거절되었을 때 미리 만들던 작업 취소 (이미 시작된 작업은 끝까지 돌고 캐시에 남음)"""
+    with _lock:
+        _cancel_locked(session_key)
+
+
+def take_visualization(session_key, vis_type, university_df, major_df, admission_df):
+    """미리 만든 시각화 가져오기 (없으면 지금 만들기)"""
+    key = _cache_key(vis_type, university_df, major_df, admission_df)
+    with _lock:
+        entry = _pending.pop(session_key, None)
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    if entry is not None:
+        if entry[0] == key and not entry[1].cancelled():
+            return entry[1].result()
+        entry[1].cancel()
+    return _build(key, vis_type, university_df, major_df, admission_df)